@@ -0,0 +1,31 @@
+"""drop unused product indexes
+
+Revision ID: 1a6e0f94c2b8
+Revises: f81b3c6a0d47
+Create Date: 2026-10-15 14:02:36.771904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1a6e0f94c2b8"
+down_revision: Union[str, Sequence[str], None] = "f81b3c6a0d47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No query filters or sorts on these columns
+    op.drop_index(op.f("ix_products_title"), table_name="products")
+    op.drop_index(op.f("ix_products_price"), table_name="products")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f("ix_products_price"), "products", ["price"], unique=False)
+    op.create_index(op.f("ix_products_title"), "products", ["title"], unique=False)
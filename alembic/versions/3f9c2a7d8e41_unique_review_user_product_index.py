@@ -0,0 +1,50 @@
+"""unique review user product index
+
+Revision ID: 3f9c2a7d8e41
+Revises: 52acdb16b175
+Create Date: 2026-10-15 10:12:41.503127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a7d8e41"
+down_revision: Union[str, Sequence[str], None] = "52acdb16b175"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One review per user and product. create_review used to check then
+    # insert, so keep only the earliest of any duplicates first
+    op.execute(
+        """
+        DELETE FROM reviews
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM reviews GROUP BY user_id, product_id
+        )
+        """
+    )
+    op.drop_index("idx_review_user_product", table_name="reviews")
+    op.create_index(
+        "idx_review_user_product",
+        "reviews",
+        ["user_id", "product_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_review_user_product", table_name="reviews")
+    op.create_index(
+        "idx_review_user_product",
+        "reviews",
+        ["user_id", "product_id"],
+        unique=False,
+    )
@@ -0,0 +1,34 @@
+"""drop redundant user_id indexes
+
+Revision ID: 5d2c8e71b9fa
+Revises: 1a6e0f94c2b8
+Create Date: 2026-10-15 14:20:09.418325
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2c8e71b9fa"
+down_revision: Union[str, Sequence[str], None] = "1a6e0f94c2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Covered by the (user_id, created_at, id) / (user_id, purchased_at, id)
+    # composite indexes
+    op.drop_index(op.f("ix_orders_user_id"), table_name="orders")
+    op.drop_index(op.f("ix_purchases_user_id"), table_name="purchases")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_purchases_user_id"), "purchases", ["user_id"], unique=False
+    )
+    op.create_index(op.f("ix_orders_user_id"), "orders", ["user_id"], unique=False)
@@ -0,0 +1,94 @@
+"""unique cart product indexes
+
+Revision ID: 8b1e4d6f2a93
+Revises: 3f9c2a7d8e41
+Create Date: 2026-10-15 11:02:17.284519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e4d6f2a93"
+down_revision: Union[str, Sequence[str], None] = "3f9c2a7d8e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # add_to_cart used to check then insert, so concurrent requests may have
+    # left duplicate lines; merge them into the lowest id before the unique
+    # indexes are built
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(dup.quantity) FROM cart_items AS dup
+            WHERE dup.user_id = cart_items.user_id
+            AND dup.product_id = cart_items.product_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items WHERE user_id IS NOT NULL
+            GROUP BY user_id, product_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items
+        WHERE user_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM cart_items WHERE user_id IS NOT NULL
+            GROUP BY user_id, product_id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(dup.quantity) FROM cart_items AS dup
+            WHERE dup.user_id IS NULL
+            AND dup.session_id = cart_items.session_id
+            AND dup.product_id = cart_items.product_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items
+            WHERE user_id IS NULL AND session_id IS NOT NULL
+            GROUP BY session_id, product_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items
+        WHERE user_id IS NULL AND session_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM cart_items
+            WHERE user_id IS NULL AND session_id IS NOT NULL
+            GROUP BY session_id, product_id
+        )
+        """
+    )
+    # Partial unique indexes used as ON CONFLICT targets by add_to_cart
+    op.create_index(
+        "idx_cart_user_product",
+        "cart_items",
+        ["user_id", "product_id"],
+        unique=True,
+        postgresql_where=sa.text("user_id IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_cart_session_product",
+        "cart_items",
+        ["session_id", "product_id"],
+        unique=True,
+        postgresql_where=sa.text("user_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_cart_session_product", table_name="cart_items")
+    op.drop_index("idx_cart_user_product", table_name="cart_items")
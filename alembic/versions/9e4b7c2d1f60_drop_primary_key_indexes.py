@@ -0,0 +1,42 @@
+"""drop primary key indexes
+
+Revision ID: 9e4b7c2d1f60
+Revises: 5d2c8e71b9fa
+Create Date: 2026-10-15 14:41:52.207163
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b7c2d1f60"
+down_revision: Union[str, Sequence[str], None] = "5d2c8e71b9fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every primary key already has its own unique index
+_TABLES = (
+    "users",
+    "categories",
+    "products",
+    "cart_items",
+    "orders",
+    "order_items",
+    "purchases",
+    "reviews",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in _TABLES:
+        op.drop_index(op.f(f"ix_{table}_id"), table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(_TABLES):
+        op.create_index(op.f(f"ix_{table}_id"), table, ["id"], unique=False)
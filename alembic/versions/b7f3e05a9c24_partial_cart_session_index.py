@@ -0,0 +1,44 @@
+"""partial cart session index
+
+Revision ID: b7f3e05a9c24
+Revises: 9e4b7c2d1f60
+Create Date: 2026-10-15 15:03:36.581247
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7f3e05a9c24"
+down_revision: Union[str, Sequence[str], None] = "9e4b7c2d1f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # user_id lookups are served by the partial idx_cart_user_product
+    op.drop_index(op.f("ix_cart_items_user_id"), table_name="cart_items")
+    op.drop_index(op.f("ix_cart_items_session_id"), table_name="cart_items")
+    op.create_index(
+        "idx_cart_session",
+        "cart_items",
+        ["session_id"],
+        unique=False,
+        postgresql_where=sa.text("session_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_cart_session", table_name="cart_items")
+    op.create_index(
+        op.f("ix_cart_items_session_id"), "cart_items", ["session_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_cart_items_user_id"), "cart_items", ["user_id"], unique=False
+    )
@@ -0,0 +1,62 @@
+"""keyset pagination indexes
+
+Revision ID: c4d7a19e5b02
+Revises: 8b1e4d6f2a93
+Create Date: 2026-10-15 11:48:03.617240
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d7a19e5b02"
+down_revision: Union[str, Sequence[str], None] = "8b1e4d6f2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The new product index starts with the old one's columns
+    op.drop_index("idx_product_category_active", table_name="products")
+    op.create_index(
+        "idx_product_category_active_created",
+        "products",
+        ["category_id", "is_active", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_order_user_created",
+        "orders",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_purchase_user_purchased",
+        "purchases",
+        ["user_id", "purchased_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_review_product_created",
+        "reviews",
+        ["product_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_review_product_created", table_name="reviews")
+    op.drop_index("idx_purchase_user_purchased", table_name="purchases")
+    op.drop_index("idx_order_user_created", table_name="orders")
+    op.drop_index("idx_product_category_active_created", table_name="products")
+    op.create_index(
+        "idx_product_category_active",
+        "products",
+        ["category_id", "is_active"],
+        unique=False,
+    )
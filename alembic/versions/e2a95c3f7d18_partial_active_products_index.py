@@ -0,0 +1,35 @@
+"""partial active products index
+
+Revision ID: e2a95c3f7d18
+Revises: c4d7a19e5b02
+Create Date: 2026-10-15 12:05:44.902371
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a95c3f7d18"
+down_revision: Union[str, Sequence[str], None] = "c4d7a19e5b02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_products_active_created",
+        "products",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_products_active_created", table_name="products")
@@ -0,0 +1,35 @@
+"""review rating check and index
+
+Revision ID: f81b3c6a0d47
+Revises: e2a95c3f7d18
+Create Date: 2026-10-15 12:41:19.055862
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f81b3c6a0d47"
+down_revision: Union[str, Sequence[str], None] = "e2a95c3f7d18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_check_constraint("ck_review_rating", "reviews", "rating BETWEEN 1 AND 5")
+    op.create_index(
+        "idx_review_product_rating",
+        "reviews",
+        ["product_id", "rating"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_review_product_rating", table_name="reviews")
+    op.drop_constraint("ck_review_rating", "reviews", type_="check")
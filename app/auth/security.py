@@ -1,23 +1,95 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from calendar import timegm
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
 
-# Use pbkdf2_sha256 to avoid bcrypt backend issues on some platforms
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# argon2id for new hashes, called directly through argon2-cffi
+password_hasher = PasswordHasher(memory_cost=19456, time_cost=2, parallelism=1)
+# pbkdf2_sha256 hashes created before the switch to argon2id
+legacy_pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Verified against when a login names an unknown user, so the response takes
+# as long as a wrong password; no password matches it
+DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(32))
 
 settings = get_settings()
 
+# Per-process cache of decoded tokens: token -> (valid_until, payload)
+_TOKEN_CACHE: Dict[str, tuple[float, Dict[str, Any]]] = {}
+_TOKEN_CACHE_MAX_SIZE = 4096
+_TOKEN_CACHE_TTL = 60.0
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+_TIME_CLAIMS = ("exp", "iat", "nbf")
 
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# For HMAC algorithms the header and keyed hash state are built once and the
+# signer is copied per token; other algorithms go through jose.
+_HEADER_B64 = _b64url(
+    json.dumps(
+        {"alg": settings.ALGORITHM, "typ": "JWT"}, separators=(",", ":")
+    ).encode()
+)
+_SIGNER: Optional[hmac.HMAC] = None
+if settings.ALGORITHM in _HMAC_DIGESTS:
+    _SIGNER = hmac.new(
+        settings.SECRET_KEY.encode(), digestmod=_HMAC_DIGESTS[settings.ALGORITHM]
+    )
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> tuple[bool, bool]:
+    """Return (valid, needs_rehash) for a password against a stored hash."""
+    if not hashed_password.startswith("$argon2"):
+        # Any legacy hash that verifies should be upgraded to argon2id
+        valid = legacy_pwd_context.verify(plain_password, hashed_password)
+        return valid, valid
+    try:
+        password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False, False
+    return True, password_hasher.check_needs_rehash(hashed_password)
+
+
+async def verify_password_and_check_rehash(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, bool]:
+    """Verify a password and report whether its hash should be replaced.
+
+    The hash needs replacing when it is a legacy scheme or argon2id with
+    parameters other than password_hasher's.
+    """
+    # Hashing is CPU-bound, keep it off the event loop
+    return await asyncio.to_thread(_verify_password, plain_password, hashed_password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    valid, _ = await verify_password_and_check_rehash(plain_password, hashed_password)
+    return valid
+
+
+async def get_password_hash(password: str) -> str:
+    return await asyncio.to_thread(password_hasher.hash, password)
 
 
 def create_access_token(
@@ -34,18 +106,41 @@ def create_access_token(
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode["exp"] = expire
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
+    if _SIGNER is None:
+        to_encode["exp"] = expire
+        return jwt.encode(
+            to_encode,
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM,
+        )
+
+    to_encode["exp"] = expire
+    # Registered time claims are NumericDate, converted the way jose does
+    for claim in _TIME_CLAIMS:
+        value = to_encode.get(claim)
+        if isinstance(value, datetime):
+            to_encode[claim] = timegm(value.utctimetuple())
+    signing_input = (
+        _HEADER_B64
+        + b"."
+        + _b64url(json.dumps(to_encode, separators=(",", ":")).encode())
     )
-    return encoded_jwt
+    signer = _SIGNER.copy()
+    signer.update(signing_input)
+    return (signing_input + b"." + _b64url(signer.digest())).decode()
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
     """Decode JWT and return its payload. Raises JWTError on failure."""
+    now = time.time()
+    cached = _TOKEN_CACHE.get(token)
+    if cached is not None:
+        valid_until, payload = cached
+        if now < valid_until:
+            return payload
+        del _TOKEN_CACHE[token]
+
     try:
         payload = jwt.decode(
             token,
@@ -54,4 +149,13 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         )
     except JWTError as exc:
         raise JWTError("Could not validate credentials") from exc
+
+    valid_until = now + _TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if exp is not None:
+        valid_until = min(valid_until, float(exp))
+    if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX_SIZE:
+        # FIFO eviction: dicts keep insertion order
+        del _TOKEN_CACHE[next(iter(_TOKEN_CACHE))]
+    _TOKEN_CACHE[token] = (valid_until, payload)
     return payload
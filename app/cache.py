@@ -0,0 +1,40 @@
+"""Per-process in-memory caching shared by the app packages."""
+
+import time
+from collections.abc import Hashable
+
+
+class TTLCache[T]:
+    """Small in-memory cache with a per-entry TTL and FIFO eviction.
+
+    Entries are invalidated explicitly on writes; the TTL bounds staleness
+    across worker processes, which do not share the cache.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict[Hashable, tuple[float, T]] = {}
+
+    def get(self, key: Hashable) -> T | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_size:
+            # FIFO eviction: dicts keep insertion order
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
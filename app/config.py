@@ -1,5 +1,3 @@
-from functools import lru_cache
-
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,10 +12,28 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "1"
 
+    # Connection pool / asyncpg driver tuning
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 1024
+    # SQLAlchemy compiled SQL cache (per engine)
+    DB_QUERY_CACHE_SIZE: int = 1200
+    # Set when connecting through PgBouncer in transaction mode, which owns
+    # pooling and cannot keep prepared statements across transactions.
+    # jit is then not sent as a startup parameter (PgBouncer rejects it);
+    # disable it with ALTER ROLE <user> SET jit = off instead
+    DB_PGBOUNCER: bool = False
+
     # Auth / security
     SECRET_KEY: str = "CHANGE_ME_SECRET_KEY"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Replace legacy or outdated password hashes with argon2id on login
+    PASSWORD_REHASH_ON_LOGIN: bool = True
 
     @property
     def database_url_async(self) -> str:
@@ -26,9 +42,19 @@ class Settings(BaseSettings):
             f"postgresql+asyncpg://{self.POSTGRES_USER}:"
             f"{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:"
             f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            f"?prepared_statement_cache_size={self.db_statement_cache_size}"
         )
 
+    @property
+    def db_statement_cache_size(self) -> int:
+        return 0 if self.DB_PGBOUNCER else self.DB_STATEMENT_CACHE_SIZE
+
+
+_SETTINGS: Settings | None = None
+
 
-@lru_cache
 def get_settings() -> Settings:
-    return Settings()
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings()
+    return _SETTINGS
@@ -1,7 +1,11 @@
+from typing import Any, ClassVar
+
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
 
-    pass
+    # Fetch server-generated defaults (created_at, updated_at, ...) with
+    # INSERT/UPDATE ... RETURNING instead of a follow-up SELECT
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
@@ -1,16 +1,48 @@
 # app/db/session.py
-from typing import AsyncGenerator
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, AsyncGenerator
+from uuid import uuid4
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.config import get_settings
 
 settings = get_settings()
 
+connect_args: dict[str, Any] = {
+    # asyncpg-level cache; SQLAlchemy's own prepared statement cache is
+    # configured via the URL (see Settings.database_url_async)
+    "statement_cache_size": settings.db_statement_cache_size,
+    "server_settings": {"jit": "off", "application_name": "content_store"},
+}
+
+if settings.DB_PGBOUNCER:
+    # PgBouncer pools server connections itself; unique statement names keep
+    # prepares from colliding on the server connections it hands out
+    pool_args: dict[str, Any] = {"poolclass": NullPool}
+    # PgBouncer rejects untracked startup parameters such as jit; see
+    # Settings.DB_PGBOUNCER
+    del connect_args["server_settings"]["jit"]
+    connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+else:
+    pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 engine = create_async_engine(
     str(settings.database_url_async),
     echo=False,
     future=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args=connect_args,
+    **pool_args,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -22,7 +54,24 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
+
+
+async def warm_up_pool() -> None:
+    """Open pool_size connections at startup so early requests skip connecting.
+
+    With PgBouncer there is no local pool to fill, so a single connection
+    only checks that the database is reachable.
+    """
+    if settings.DB_PGBOUNCER:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(
+                stack.enter_async_context(engine.connect())
+                for _ in range(settings.DB_POOL_SIZE)
+            )
+        )
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
@@ -1,8 +1,7 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-
-from app.db.session import engine
+from app.db.session import engine, warm_up_pool
 from app.user.routes import router as user_router
 from app.store.routes import router as store_router
 
@@ -10,9 +9,8 @@ from app.store.routes import router as store_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
-    async with engine.begin() as conn:
-        # опционально: проверка, что БД доступна
-        await conn.run_sync(lambda _: None)
+    # also checks that the database is reachable
+    await warm_up_pool()
     yield
     # shutdown
     await engine.dispose()
@@ -25,7 +23,7 @@ app.include_router(store_router, prefix="/api")
 
 
 @app.get("/")
-async def root():
+async def root() -> dict[str, str]:
     return {"message": "Hello World"}
 
 
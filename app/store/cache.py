@@ -0,0 +1,13 @@
+"""Per-process read-through caches for rarely changing store responses."""
+
+from app.cache import TTLCache
+
+CATEGORIES_KEY = "categories:all"
+
+# Values are serialized JSON response bodies, so hits skip validation and
+# encoding as well as the database
+categories_cache: TTLCache[bytes] = TTLCache(ttl=60.0, max_size=1)
+# Keyed by product id
+products_cache: TTLCache[bytes] = TTLCache(ttl=300.0)
+# Keyed by (category_id, cursor, limit); values also carry the next cursor
+product_lists_cache: TTLCache[tuple[bytes, str | None]] = TTLCache(ttl=30.0)
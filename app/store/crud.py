@@ -1,13 +1,34 @@
-from decimal import Decimal
-from typing import Optional, Sequence
+from typing import Any, AsyncIterator, Optional, Sequence
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, and_, or_, delete
+from sqlalchemy import (
+    Row,
+    StatementLambdaElement,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    lambda_stmt,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.db.utils import dialect_insert
 from app.store import schemas
+from app.store.cache import (
+    CATEGORIES_KEY,
+    categories_cache,
+    product_lists_cache,
+    products_cache,
+)
 from app.store.models import (
     Order,
     CartItem,
@@ -17,13 +38,35 @@ from app.store.models import (
     Purchase,
     Review,
 )
+from app.store.pagination import Cursor
 from app.user import schemas as user_schemas
+from app.user.models import User
+
+
+def _paginate(
+    stmt: StatementLambdaElement,
+    timestamp_column: Any,
+    id_column: Any,
+    cursor: Optional[Cursor],
+    limit: int,
+) -> StatementLambdaElement:
+    """Keyset pagination: newest first, seeking past the cursor row.
+
+    List queries are built with lambda_stmt so the compiled SQL is cached
+    and only the bound values change between calls.
+    """
+    if cursor is not None:
+        cursor_ts, cursor_id = cursor
+        stmt += lambda s: s.where(
+            tuple_(timestamp_column, id_column) < tuple_(cursor_ts, cursor_id)
+        )
+    stmt += lambda s: s.order_by(timestamp_column.desc(), id_column.desc()).limit(limit)
+    return stmt
 
 
 # Category CRUD
 async def get_category_by_id(db: AsyncSession, category_id: int) -> Optional[Category]:
-    result = await db.execute(select(Category).where(Category.id == category_id))
-    return result.scalar_one_or_none()
+    return await db.get(Category, category_id)
 
 
 async def get_categories(db: AsyncSession) -> list[Category]:
@@ -51,7 +94,7 @@ async def create_category(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category with this name already exists",
         )
-    await db.refresh(category)
+    categories_cache.delete(CATEGORIES_KEY)
     return category
 
 
@@ -70,25 +113,39 @@ async def delete_category(
         )
     await db.delete(category)
     await db.commit()
+    categories_cache.delete(CATEGORIES_KEY)
+    # Cached products embed their category
+    products_cache.clear()
+    product_lists_cache.clear()
 
 
 # Product CRUD
 async def get_product_by_id(db: AsyncSession, product_id: int) -> Optional[Product]:
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    return result.scalar_one_or_none()
+    # The category is serialized with the product
+    return await db.get(Product, product_id, options=[joinedload(Product.category)])
+
+
+async def product_exists(db: AsyncSession, product_id: int) -> bool:
+    return bool(await db.scalar(select(exists().where(Product.id == product_id))))
 
 
 async def get_products(
     db: AsyncSession,
     category_id: Optional[int] = None,
-    skip: int = 0,
+    cursor: Optional[Cursor] = None,
     limit: int = 100,
 ) -> list[Product]:
-    query = select(Product).where(Product.is_active)
+    stmt = lambda_stmt(
+        lambda: (
+            select(Product)
+            .where(Product.is_active)
+            .options(selectinload(Product.category))
+        )
+    )
     if category_id:
-        query = query.where(Product.category_id == category_id)
-    query = query.order_by(Product.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
+        stmt += lambda s: s.where(Product.category_id == category_id)
+    stmt = _paginate(stmt, Product.created_at, Product.id, cursor, limit)
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
@@ -105,7 +162,12 @@ async def create_product(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error creating product",
         )
-    await db.refresh(product)
+    product_lists_cache.clear()
+    # The category is serialized with the product
+    category = None
+    if product.category_id is not None:
+        category = await get_category_by_id(db, product.category_id)
+    set_committed_value(product, "category", category)
     return product
 
 
@@ -120,43 +182,58 @@ async def update_product(
     update_data = product_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(product, field, value)
-    db.add(product)
     await db.commit()
-    await db.refresh(product)
+    products_cache.delete(product_id)
+    product_lists_cache.clear()
     return product
 
 
 async def delete_product(db: AsyncSession, product_id: int) -> None:
-    product = await get_product_by_id(db, product_id)
-    if product is None:
+    # Dependent rows are removed by the ON DELETE CASCADE foreign keys
+    result = await db.execute(
+        delete(Product).where(Product.id == product_id).returning(Product.id)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
-    await db.delete(product)
     await db.commit()
+    products_cache.delete(product_id)
+    product_lists_cache.clear()
 
 
 # CartItem CRUD
 async def get_cart_items(
-    db: AsyncSession, user_id: Optional[int] = None, session_id: Optional[str] = None
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    session_id: Optional[str] = None,
+    require_active_product: bool = False,
 ) -> list[CartItem]:
-    query = select(CartItem)
+    # Products and their categories are always serialized with the cart;
+    # both are many-to-one, so join them into the same query
+    query = (
+        select(CartItem)
+        .join(CartItem.product)
+        .outerjoin(Product.category)
+        .options(contains_eager(CartItem.product).contains_eager(Product.category))
+    )
     conditions = []
     if user_id:
         conditions.append(CartItem.user_id == user_id)
     if session_id:
         conditions.append(CartItem.session_id == session_id)
-    if conditions:
-        query = query.options(selectinload(CartItem.product)).where(or_(*conditions))
-    else:
+    if not conditions:
         return []
+    if require_active_product:
+        query = query.where(Product.is_active)
+    query = query.where(or_(*conditions))
     result = await db.execute(query.order_by(CartItem.created_at.desc()))
     return list(result.scalars().all())
 
 
 async def get_cart_item_by_id(db: AsyncSession, item_id: int) -> Optional[CartItem]:
-    result = await db.execute(select(CartItem).where(CartItem.id == item_id))
-    return result.scalar_one_or_none()
+    return await db.get(CartItem, item_id)
 
 
 async def add_to_cart(
@@ -166,64 +243,78 @@ async def add_to_cart(
     user_id: Optional[int] = None,
     session_id: Optional[str] = None,
 ) -> CartItem:
-    # Check if product exists
-    product = await get_product_by_id(db, product_id)
-    if product is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
-        )
-    if not product.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Product is not active"
-        )
-
-    # Check if item already in cart
-    query = select(CartItem).where(CartItem.product_id == product_id)
+    # Insert or bump the quantity of the existing row in one statement; the
+    # SELECT from products only yields a row for an existing active product
+    columns = CartItem.__table__.c
+    stmt = dialect_insert(db, CartItem).from_select(
+        ["product_id", "quantity", "user_id", "session_id"],
+        select(
+            Product.id,
+            literal(quantity, columns.quantity.type),
+            literal(user_id, columns.user_id.type),
+            literal(session_id, columns.session_id.type),
+        ).where(and_(Product.id == product_id, Product.is_active)),
+    )
     if user_id:
-        query = query.where(CartItem.user_id == user_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "product_id"],
+            index_where=CartItem.user_id.is_not(None),
+            set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+        )
     elif session_id:
-        query = query.where(CartItem.session_id == session_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["session_id", "product_id"],
+            index_where=CartItem.user_id.is_(None),
+            set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+        )
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either user_id or session_id must be provided",
         )
 
-    existing = await db.execute(query)
-    existing_item = existing.scalar_one_or_none()
-
-    if existing_item:
-        existing_item.quantity += quantity
-        db.add(existing_item)
-    else:
-        cart_item = CartItem(
-            product_id=product_id,
-            quantity=quantity,
-            user_id=user_id,
-            session_id=session_id,
+    result = await db.execute(
+        stmt.returning(CartItem),
+        execution_options={"populate_existing": True},
+    )
+    cart_item = result.scalar_one_or_none()
+    if cart_item is None:
+        await db.rollback()
+        # Nothing inserted: the product is missing or inactive
+        is_active = await db.scalar(
+            select(Product.is_active).where(Product.id == product_id)
+        )
+        if is_active is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Product is not active"
         )
-        db.add(cart_item)
-        existing_item = cart_item
+
+    # The product and its category are serialized with the item
+    product = await db.get(Product, product_id, options=[joinedload(Product.category)])
+    set_committed_value(cart_item, "product", product)
 
     await db.commit()
-    await db.refresh(existing_item)
-    return existing_item
+    return cart_item
 
 
 async def remove_from_cart(db: AsyncSession, item_id: int) -> None:
-    item = await get_cart_item_by_id(db, item_id)
-    if item is None:
+    result = await db.execute(
+        delete(CartItem).where(CartItem.id == item_id).returning(CartItem.id)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found"
         )
-    await db.delete(item)
     await db.commit()
 
 
 async def clear_cart(
     db: AsyncSession, user_id: Optional[int] = None, session_id: Optional[str] = None
 ) -> None:
-    query = select(CartItem)
     conditions = []
     if user_id:
         conditions.append(CartItem.user_id == user_id)
@@ -231,29 +322,58 @@ async def clear_cart(
         conditions.append(CartItem.session_id == session_id)
     if not conditions:
         return
-    query = query.where(or_(*conditions))
-    result = await db.execute(query)
-    items = result.scalars().all()
-    for item in items:
-        await db.delete(item)
+    await db.execute(delete(CartItem).where(or_(*conditions)))
     await db.commit()
 
 
 # Order CRUD
 async def get_order_by_id(db: AsyncSession, order_id: int) -> Optional[Order]:
-    result = await db.execute(select(Order).where(Order.id == order_id))
-    return result.scalar_one_or_none()
+    # The items and their products are serialized with the order
+    return await db.get(
+        Order,
+        order_id,
+        options=[
+            selectinload(Order.order_items)
+            .selectinload(OrderItem.product)
+            .selectinload(Product.category)
+        ],
+    )
+
+
+async def get_order_owner_and_status(
+    db: AsyncSession, order_id: int
+) -> Optional[Row[tuple[int, str]]]:
+    """Fetch only (user_id, status) for access checks that do not return the order."""
+    result = await db.execute(
+        select(Order.user_id, Order.status).where(Order.id == order_id)
+    )
+    return result.one_or_none()
 
 
 async def get_user_orders(
-    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[Cursor] = None,
+    limit: int = 100,
 ) -> list[Order]:
     result = await db.execute(
-        select(Order)
-        .where(Order.user_id == user_id)
-        .order_by(Order.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+        _paginate(
+            lambda_stmt(
+                lambda: (
+                    select(Order)
+                    .where(Order.user_id == user_id)
+                    .options(
+                        selectinload(Order.order_items)
+                        .selectinload(OrderItem.product)
+                        .selectinload(Product.category)
+                    )
+                )
+            ),
+            Order.created_at,
+            Order.id,
+            cursor,
+            limit,
+        )
     )
     return list(result.scalars().all())
 
@@ -261,104 +381,190 @@ async def get_user_orders(
 async def create_order_from_cart(
     db: AsyncSession, user_id: int, session_id: str = None
 ) -> Order:
-    # Fetch cart items with products and their categories
-    cart_stmt = (
-        select(CartItem)
-        .where(
-            (CartItem.user_id == user_id)
-            if user_id
-            else (CartItem.session_id == session_id)
-        )
-        .options(selectinload(CartItem.product).selectinload(Product.category))
+    if user_id:
+        session_id = None
+        in_cart = CartItem.user_id == user_id
+    elif session_id:
+        in_cart = CartItem.session_id == session_id
+    else:
+        raise ValueError("Cart is empty")
+
+    # Fetch cart items with active products and their categories in one
+    # query; the order is only created when that is the whole cart
+    cart_items = await get_cart_items(
+        db, user_id=user_id, session_id=session_id, require_active_product=True
     )
-    cart_result = await db.execute(cart_stmt)
-    cart_items = cart_result.scalars().all()
+    cart_size = await db.scalar(
+        select(func.count()).select_from(CartItem).where(in_cart)
+    )
+    if len(cart_items) < cart_size:
+        # Only on failure: look up which products blocked the order
+        inactive_ids = await db.scalars(
+            select(CartItem.product_id)
+            .join(CartItem.product)
+            .where(in_cart, Product.is_active.is_(False))
+            .order_by(CartItem.product_id)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Products are not active: "
+            + ", ".join(str(product_id) for product_id in inactive_ids),
+        )
 
     if not cart_items:
         raise ValueError("Cart is empty")
 
-    total_amount = Decimal(
-        sum(item.product.price * item.quantity for item in cart_items)
-    )
+    cart_item_ids = [cart_item.id for cart_item in cart_items]
 
-    # Create order
-    order = Order(user_id=user_id, total_amount=total_amount)
-    db.add(order)
-    await db.flush()
-
-    # Create order items
-    for cart_item in cart_items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=cart_item.product_id,
-            quantity=cart_item.quantity,
-            price_at_purchase=cart_item.product.price,
-        )
-        db.add(order_item)
-
-    # Remove cart items
-    delete_stmt = delete(CartItem).where(
-        (CartItem.user_id == user_id)
-        if user_id
-        else (CartItem.session_id == session_id)
+    # Total and order items are both computed by the database from the same
+    # cart lines, so prices never round-trip through Python
+    cart_lines = (
+        select(CartItem.product_id, CartItem.quantity, Product.price)
+        .join(CartItem.product)
+        .where(CartItem.id.in_(cart_item_ids))
+        .cte("cart_lines")
     )
-    await db.execute(delete_stmt)
-
-    # Re-fetch order with full relationships eager-loaded
-    order_stmt = (
-        select(Order)
-        .where(Order.id == order.id)
-        .options(
-            selectinload(Order.order_items)
-            .selectinload(OrderItem.product)
-            .selectinload(Product.category),
-            selectinload(Order.user),
+    order = await db.scalar(
+        insert(Order)
+        .from_select(
+            ["user_id", "total_amount"],
+            select(
+                literal(user_id),
+                func.sum(cart_lines.c.price * cart_lines.c.quantity),
+            ),
         )
+        .returning(Order)
     )
-    result = await db.execute(order_stmt)
-    order = result.scalar_one()
+    order_items = await db.scalars(
+        insert(OrderItem)
+        .from_select(
+            ["order_id", "product_id", "quantity", "price_at_purchase"],
+            select(
+                literal(order.id),
+                cart_lines.c.product_id,
+                cart_lines.c.quantity,
+                cart_lines.c.price,
+            ),
+        )
+        .returning(OrderItem)
+    )
+
+    # Populate relationships from what is already loaded instead of
+    # re-selecting the order graph
+    products = {cart_item.product_id: cart_item.product for cart_item in cart_items}
+    order_items = list(order_items)
+    for order_item in order_items:
+        set_committed_value(order_item, "product", products[order_item.product_id])
+    set_committed_value(order, "order_items", order_items)
+
+    # Remove ordered cart items
+    delete_stmt = delete(CartItem).where(CartItem.id.in_(cart_item_ids))
+    await db.execute(delete_stmt)
 
     await db.commit()
     return order
 
 
-async def update_order_status(
-    db: AsyncSession, order_id: int, status: str, payment_id: Optional[str] = None
-) -> Order:
-    order = await get_order_by_id(db, order_id)
+async def pay_order(
+    db: AsyncSession, order_id: int, user_id: int, payment_id: str
+) -> Optional[Order]:
+    """Mark the user's pending order as paid and record its purchases.
+
+    The ownership and status checks are part of the UPDATE, so an order can
+    only be paid once. Returns None when no pending order of the user matched.
+    """
+    order = await db.scalar(
+        update(Order)
+        .where(
+            and_(
+                Order.id == order_id,
+                Order.user_id == user_id,
+                Order.status == "pending",
+            )
+        )
+        .values(status="paid", payment_id=payment_id)
+        .returning(Order)
+        .options(
+            selectinload(Order.order_items)
+            .selectinload(OrderItem.product)
+            .selectinload(Product.category)
+        ),
+        execution_options={"populate_existing": True},
+    )
     if order is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+        await db.rollback()
+        return None
+
+    # Grant access to every ordered product with one INSERT ... SELECT
+    await db.execute(
+        insert(Purchase).from_select(
+            ["user_id", "order_id", "product_id"],
+            select(literal(user_id), OrderItem.order_id, OrderItem.product_id).where(
+                OrderItem.order_id == order_id
+            ),
         )
-    order.status = status
-    if payment_id:
-        order.payment_id = payment_id
-    db.add(order)
+    )
     await db.commit()
-    await db.refresh(order)
     return order
 
 
 # Purchase CRUD
 async def get_user_purchases(
-    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[Cursor] = None,
+    limit: int = 100,
 ) -> list[Purchase]:
     result = await db.execute(
-        select(Purchase)
-        .where(Purchase.user_id == user_id)
-        .options(selectinload(Purchase.order).selectinload(Order.order_items))
-        .order_by(Purchase.purchased_at.desc())
-        .offset(skip)
-        .limit(limit)
+        _paginate(
+            lambda_stmt(
+                lambda: (
+                    select(Purchase)
+                    .where(Purchase.user_id == user_id)
+                    .options(
+                        selectinload(Purchase.product).selectinload(Product.category),
+                        selectinload(Purchase.order)
+                        .selectinload(Order.order_items)
+                        .selectinload(OrderItem.product)
+                        .selectinload(Product.category),
+                    )
+                )
+            ),
+            Purchase.purchased_at,
+            Purchase.id,
+            cursor,
+            limit,
+        )
     )
     return list(result.scalars().all())
 
 
-async def get_purchase_content(
-    db: AsyncSession, user_id: int, order_id: int
-) -> list[schemas.PurchaseContentRead]:
-    result = await db.execute(
-        select(Purchase, Product)
+async def iter_user_purchases(
+    db: AsyncSession, user_id: int, batch_size: int = 200
+) -> AsyncIterator[Purchase]:
+    """Stream all of a user's purchases, holding one batch in memory at a time."""
+    result = await db.stream_scalars(
+        select(Purchase)
+        .where(Purchase.user_id == user_id)
+        .order_by(Purchase.purchased_at.desc(), Purchase.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    async for purchase in result:
+        yield purchase
+
+
+async def iter_purchase_content(
+    db: AsyncSession, user_id: int, order_id: int, batch_size: int = 50
+) -> AsyncIterator[schemas.PurchaseContentRead]:
+    """Stream the purchased content of an order, one batch of rows at a time."""
+    # Select only the needed columns to skip ORM object construction
+    result = await db.stream(
+        select(
+            Purchase.product_id,
+            Product.title.label("product_title"),
+            Product.content_text,
+            Purchase.purchased_at,
+        )
         .join(Product, Purchase.product_id == Product.id)
         .where(
             and_(
@@ -366,43 +572,56 @@ async def get_purchase_content(
                 Purchase.order_id == order_id,
             )
         )
+        .execution_options(yield_per=batch_size)
     )
-    purchases = result.all()
-    return [
-        schemas.PurchaseContentRead(
-            product_id=purchase.product_id,
-            product_title=product.title,
-            content_text=product.content_text,
-            purchased_at=purchase.purchased_at,
-        )
-        for purchase, product in purchases
-    ]
+    async for row in result.mappings():
+        # Flat rows straight from typed columns: nothing to validate
+        yield schemas.PurchaseContentRead.model_construct(**row)
 
 
 async def has_user_purchased_product(
     db: AsyncSession, user_id: int, product_id: int
 ) -> bool:
     result = await db.execute(
-        select(Purchase).where(
-            and_(
-                Purchase.user_id == user_id,
-                Purchase.product_id == product_id,
+        select(
+            exists().where(
+                and_(
+                    Purchase.user_id == user_id,
+                    Purchase.product_id == product_id,
+                )
             )
         )
     )
-    return result.scalar_one_or_none() is not None
+    return bool(result.scalar())
 
 
 # Review CRUD
 async def get_reviews_by_product(
-    db: AsyncSession, product_id: int, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    product_id: int,
+    cursor: Optional[Cursor] = None,
+    limit: int = 100,
 ) -> list[Review]:
     result = await db.execute(
-        select(Review)
-        .where(Review.product_id == product_id)
-        .order_by(Review.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+        _paginate(
+            lambda_stmt(
+                lambda: (
+                    select(Review)
+                    .where(Review.product_id == product_id)
+                    # Authors are serialized as UserRead, which has no use
+                    # for the password hash
+                    .options(
+                        selectinload(Review.user).defer(
+                            User.hashed_password, raiseload=True
+                        )
+                    )
+                )
+            ),
+            Review.created_at,
+            Review.id,
+            cursor,
+            limit,
+        )
     )
     return list(result.scalars().all())
 
@@ -411,59 +630,78 @@ async def get_reviews(
     db: AsyncSession, skip: int = 0, limit: int = 100
 ) -> Sequence[Review]:
     result = await db.execute(
-        select(Review).order_by(Review.created_at.desc()).offset(skip).limit(limit)
+        select(Review)
+        .options(selectinload(Review.user).defer(User.hashed_password, raiseload=True))
+        .order_by(Review.created_at.desc())
+        .offset(skip)
+        .limit(limit)
     )
     return result.scalars().all()
 
 
 async def get_review_by_id(db: AsyncSession, review_id: int) -> Optional[Review]:
-    result = await db.execute(select(Review).where(Review.id == review_id))
-    return result.scalar_one_or_none()
+    return await db.get(Review, review_id)
 
 
 async def create_review(
     db: AsyncSession, review_in: schemas.ReviewCreate, user_id: int, product_id: int
 ) -> Review:
-    # Check if user has purchased the product
-    has_purchased = await has_user_purchased_product(db, user_id, product_id)
-    if not has_purchased:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only review products you have purchased",
-        )
-
-    # Check if review already exists
-    existing = await db.execute(
-        select(Review).where(
-            and_(
-                Review.user_id == user_id,
-                Review.product_id == product_id,
-            )
-        )
+    # Insert only if the user purchased the product and has not reviewed it
+    # yet (unique (user_id, product_id) index), all in one statement
+    values = {**review_in.model_dump(), "user_id": user_id, "product_id": product_id}
+    columns = Review.__table__.c
+    purchased = exists().where(
+        and_(Purchase.user_id == user_id, Purchase.product_id == product_id)
     )
-    if existing.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already reviewed this product",
+    stmt = (
+        dialect_insert(db, Review)
+        .from_select(
+            list(values),
+            select(
+                *(literal(value, columns[key].type) for key, value in values.items())
+            ).where(purchased),
         )
-
-    review = Review(**review_in.model_dump(), user_id=user_id, product_id=product_id)
-    db.add(review)
+        .on_conflict_do_nothing(index_elements=["user_id", "product_id"])
+        .returning(Review)
+        # The author is serialized with the review
+        .options(selectinload(Review.user).defer(User.hashed_password, raiseload=True))
+    )
     try:
-        await db.commit()
+        review = (await db.execute(stmt)).scalar_one_or_none()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Error creating review"
         )
-    await db.refresh(review)
+    if review is None:
+        await db.rollback()
+        # Nothing inserted: find out which precondition failed
+        if not await product_exists(db, product_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            )
+        if not await has_user_purchased_product(db, user_id, product_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only review products you have purchased",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already reviewed this product",
+        )
+    await db.commit()
     return review
 
 
 async def update_review(
     db: AsyncSession, review_id: int, review_in: schemas.ReviewUpdate, user_id: int
 ) -> Review:
-    review = await get_review_by_id(db, review_id)
+    # The author is serialized with the review
+    review = await db.get(
+        Review,
+        review_id,
+        options=[selectinload(Review.user).defer(User.hashed_password, raiseload=True)],
+    )
     if review is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Review not found"
@@ -476,13 +714,18 @@ async def update_review(
     update_data = review_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(review, field, value)
-    db.add(review)
     await db.commit()
-    await db.refresh(review)
     return review
 
 
-async def delete_review(db: AsyncSession, review_id: int) -> None:
-    result = await db.execute(delete(Review).where(Review.id == review_id))
+async def delete_review(
+    db: AsyncSession, review_id: int, user_id: Optional[int] = None
+) -> bool:
+    """Delete a review, restricted to the author's reviews when user_id is set."""
+    stmt = delete(Review).where(Review.id == review_id)
+    if user_id is not None:
+        stmt = stmt.where(Review.user_id == user_id)
+    result = await db.execute(stmt.returning(Review.id))
+    deleted = result.scalar_one_or_none() is not None
     await db.commit()
-    return result.rowcount > 0
+    return deleted
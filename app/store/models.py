@@ -4,6 +4,7 @@ from typing import Optional, TypeAlias
 
 from sqlalchemy import (
     Boolean,
+    CheckConstraint,
     DateTime,
     ForeignKey,
     Integer,
@@ -12,6 +13,7 @@ from sqlalchemy import (
     Text,
     func,
     Index,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -24,7 +26,7 @@ User: TypeAlias = "User"
 class Category(Base):
     __tablename__ = "categories"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(
         String(100), unique=True, nullable=False, index=True
     )
@@ -47,11 +49,14 @@ class Category(Base):
 class Product(Base):
     __tablename__ = "products"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    title: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, index=True)
-    content_text: Mapped[str] = mapped_column(Text, nullable=False)
+    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    # Paid content; only the purchase content endpoint selects it
+    content_text: Mapped[str] = mapped_column(
+        Text, nullable=False, deferred=True, deferred_raiseload=True
+    )
     category_id: Mapped[int] = mapped_column(
         ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True
     )
@@ -73,19 +78,48 @@ class Product(Base):
         "Category", back_populates="products"
     )
     cart_items: Mapped[list["CartItem"]] = relationship(
-        "CartItem", back_populates="product", cascade="all, delete-orphan"
+        "CartItem",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
     order_items: Mapped[list["OrderItem"]] = relationship(
-        "OrderItem", back_populates="product", cascade="all, delete-orphan"
+        "OrderItem",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
     purchases: Mapped[list["Purchase"]] = relationship(
-        "Purchase", back_populates="product", cascade="all, delete-orphan"
+        "Purchase",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
     reviews: Mapped[list["Review"]] = relationship(
-        "Review", back_populates="product", cascade="all, delete-orphan"
+        "Review",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
 
-    __table_args__ = (Index("idx_product_category_active", "category_id", "is_active"),)
+    # Matches get_products: filter by category and is_active, then walk
+    # (created_at, id) backwards for keyset pagination
+    __table_args__ = (
+        Index(
+            "idx_product_category_active_created",
+            "category_id",
+            "is_active",
+            "created_at",
+            "id",
+        ),
+        # Unfiltered listing only ever reads active products
+        Index(
+            "idx_products_active_created",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     def __str__(self):
         return f"<Product {self.id}: {self.title}>"
@@ -94,13 +128,11 @@ class Product(Base):
 class CartItem(Base):
     __tablename__ = "cart_items"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
-    )
-    session_id: Mapped[Optional[str]] = mapped_column(
-        String(100), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
+    session_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     product_id: Mapped[int] = mapped_column(
         ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -115,7 +147,35 @@ class CartItem(Base):
     user: Mapped[Optional[User]] = relationship("User")
     product: Mapped["Product"] = relationship("Product", back_populates="cart_items")
 
-    __table_args__ = (Index("idx_cart_user_session", "user_id", "session_id"),)
+    __table_args__ = (
+        Index("idx_cart_user_session", "user_id", "session_id"),
+        # Only rows that carry a session id; lookups by user_id use the
+        # partial idx_cart_user_product below
+        Index(
+            "idx_cart_session",
+            "session_id",
+            postgresql_where=text("session_id IS NOT NULL"),
+            sqlite_where=text("session_id IS NOT NULL"),
+        ),
+        # One row per product in a user's cart and in an anonymous session's
+        # cart; add_to_cart relies on these for ON CONFLICT
+        Index(
+            "idx_cart_user_product",
+            "user_id",
+            "product_id",
+            unique=True,
+            postgresql_where=text("user_id IS NOT NULL"),
+            sqlite_where=text("user_id IS NOT NULL"),
+        ),
+        Index(
+            "idx_cart_session_product",
+            "session_id",
+            "product_id",
+            unique=True,
+            postgresql_where=text("user_id IS NULL"),
+            sqlite_where=text("user_id IS NULL"),
+        ),
+    )
 
     def __str__(self):
         return f"<CartItem {self.id}: {self.product.title} x {self.quantity}>"
@@ -124,9 +184,9 @@ class CartItem(Base):
 class Order(Base):
     __tablename__ = "orders"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     total_amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     status: Mapped[str] = mapped_column(
@@ -150,12 +210,20 @@ class Order(Base):
     # Relationships
     user: Mapped[User] = relationship("User")
     order_items: Mapped[list["OrderItem"]] = relationship(
-        "OrderItem", back_populates="order", cascade="all, delete-orphan"
+        "OrderItem",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
     purchases: Mapped[list["Purchase"]] = relationship(
-        "Purchase", back_populates="order", cascade="all, delete-orphan"
+        "Purchase",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
     )
 
+    __table_args__ = (Index("idx_order_user_created", "user_id", "created_at", "id"),)
+
     def __str__(self):
         return f"<Order {self.id}>"
 
@@ -163,7 +231,7 @@ class Order(Base):
 class OrderItem(Base):
     __tablename__ = "order_items"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     order_id: Mapped[int] = mapped_column(
         ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -184,9 +252,9 @@ class OrderItem(Base):
 class Purchase(Base):
     __tablename__ = "purchases"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     order_id: Mapped[int] = mapped_column(
         ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
@@ -205,7 +273,10 @@ class Purchase(Base):
     order: Mapped["Order"] = relationship("Order", back_populates="purchases")
     product: Mapped["Product"] = relationship("Product", back_populates="purchases")
 
-    __table_args__ = (Index("idx_purchase_user_product", "user_id", "product_id"),)
+    __table_args__ = (
+        Index("idx_purchase_user_product", "user_id", "product_id"),
+        Index("idx_purchase_user_purchased", "user_id", "purchased_at", "id"),
+    )
 
     def __str__(self):
         return f"<Purchase {self.id}>"
@@ -214,7 +285,7 @@ class Purchase(Base):
 class Review(Base):
     __tablename__ = "reviews"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -233,7 +304,13 @@ class Review(Base):
     user: Mapped[User] = relationship("User")
     product: Mapped["Product"] = relationship("Product", back_populates="reviews")
 
-    __table_args__ = (Index("idx_review_user_product", "user_id", "product_id"),)
+    __table_args__ = (
+        Index("idx_review_user_product", "user_id", "product_id", unique=True),
+        Index("idx_review_product_created", "product_id", "created_at", "id"),
+        # Lets per-product rating aggregates run as index-only scans
+        Index("idx_review_product_rating", "product_id", "rating"),
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_review_rating"),
+    )
 
     def __str__(self):
         return f"<Review {self.id}>"
@@ -0,0 +1,54 @@
+"""Keyset (seek) pagination helpers for store list endpoints."""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Decode an opaque cursor. Raises HTTP 400 on malformed input."""
+    if cursor is None:
+        return None
+    try:
+        created_at, item_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def next_cursor(
+    items: Sequence, limit: int, timestamp_attr: str = "created_at"
+) -> Optional[str]:
+    """Cursor of the next page, or None when the current page is not full."""
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, timestamp_attr), last.id)
+
+
+def set_next_cursor(
+    response: Response,
+    items: Sequence,
+    limit: int,
+    timestamp_attr: str = "created_at",
+) -> None:
+    """Expose the cursor of the next page when the current page is full."""
+    cursor = next_cursor(items, limit, timestamp_attr)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,16 +1,58 @@
-from typing import Annotated, Optional
+from typing import Annotated, Any, AsyncIterator, Optional, Sequence
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.store import crud, schemas
+from app.store.cache import (
+    CATEGORIES_KEY,
+    categories_cache,
+    product_lists_cache,
+    products_cache,
+)
+from app.store.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    next_cursor,
+    set_next_cursor,
+)
 from app.user.routes import get_current_user, get_current_user_or_none, require_staff
 from app.user import schemas as user_schemas
 
 router = APIRouter(prefix="/store", tags=["store"])
 
+_CATEGORY_LIST = TypeAdapter(list[schemas.CategoryRead])
+_PRODUCT_LIST = TypeAdapter(list[schemas.ProductRead])
+_ORDER_LIST = TypeAdapter(list[schemas.OrderRead])
+_PURCHASE_LIST = TypeAdapter(list[schemas.PurchaseRead])
+_PURCHASE_CONTENT = TypeAdapter(schemas.PurchaseContentRead)
+
+
+def _dump_list(adapter: TypeAdapter, items: Sequence[Any]) -> bytes:
+    """Validate ORM rows and encode them to JSON in a single pydantic-core pass."""
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+async def _json_array(
+    items: AsyncIterator[Any], adapter: TypeAdapter
+) -> AsyncIterator[bytes]:
+    """Encode items as a JSON array, one element per chunk."""
+    yield b"["
+    separator = b""
+    async for item in items:
+        yield separator + adapter.dump_json(item)
+        separator = b","
+    yield b"]"
+
+
+def _json_response(body: bytes) -> Response:
+    # Returning a Response skips FastAPI's second validation of the content
+    return Response(content=body, media_type="application/json")
+
 
 # Public endpoints
 @router.get(
@@ -18,10 +60,14 @@ router = APIRouter(prefix="/store", tags=["store"])
 )
 async def get_categories(
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> list[schemas.CategoryRead]:
+) -> Response:
     """Get list of all categories."""
-    categories = await crud.get_categories(db)
-    return [schemas.CategoryRead.model_validate(c) for c in categories]
+    body = categories_cache.get(CATEGORIES_KEY)
+    if body is None:
+        categories = await crud.get_categories(db)
+        body = _dump_list(_CATEGORY_LIST, categories)
+        categories_cache.set(CATEGORIES_KEY, body)
+    return _json_response(body)
 
 
 @router.post(
@@ -115,14 +161,27 @@ async def delete_product(
 async def get_products(
     db: Annotated[AsyncSession, Depends(get_db)],
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER}"
+    ),
     limit: int = Query(100, ge=1, le=100),
-) -> list[schemas.ProductRead]:
+) -> Response:
     """Get list of all active products with optional category filter."""
-    products = await crud.get_products(
-        db, category_id=category_id, skip=skip, limit=limit
-    )
-    return [schemas.ProductRead.model_validate(p) for p in products]
+    decoded_cursor = decode_cursor(cursor)
+    key = (category_id, cursor, limit)
+    cached = product_lists_cache.get(key)
+    if cached is None:
+        products = await crud.get_products(
+            db, category_id=category_id, cursor=decoded_cursor, limit=limit
+        )
+        body = _dump_list(_PRODUCT_LIST, products)
+        cached = (body, next_cursor(products, limit))
+        product_lists_cache.set(key, cached)
+    body, next_page = cached
+    response = _json_response(body)
+    if next_page is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_page
+    return response
 
 
 @router.get(
@@ -133,14 +192,20 @@ async def get_products(
 async def get_product(
     product_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> schemas.ProductDetailRead:
+) -> Response:
     """Get product details (without content text)."""
-    product = await crud.get_product_by_id(db, product_id)
-    if product is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+    body = products_cache.get(product_id)
+    if body is None:
+        product = await crud.get_product_by_id(db, product_id)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            )
+        body = (
+            schemas.ProductDetailRead.model_validate(product).model_dump_json().encode()
         )
-    return schemas.ProductDetailRead.model_validate(product)
+        products_cache.set(product_id, body)
+    return _json_response(body)
 
 
 @router.get(
@@ -150,18 +215,22 @@ async def get_product(
 )
 async def get_product_reviews(
     product_id: int,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER}"
+    ),
     limit: int = Query(100, ge=1, le=100),
 ) -> list[schemas.ReviewRead]:
     """Get reviews for a product."""
-    # Check if product exists
-    product = await crud.get_product_by_id(db, product_id)
-    if product is None:
+    if not await crud.product_exists(db, product_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
-    reviews = await crud.get_reviews_by_product(db, product_id, skip=skip, limit=limit)
+    reviews = await crud.get_reviews_by_product(
+        db, product_id, cursor=decode_cursor(cursor), limit=limit
+    )
+    set_next_cursor(response, reviews, limit)
     return [schemas.ReviewRead.model_validate(r) for r in reviews]
 
 
@@ -266,14 +335,18 @@ async def create_order(
 async def get_orders(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: user_schemas.UserRead = Depends(get_current_user),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER}"
+    ),
     limit: int = Query(100, ge=1, le=100),
-) -> list[schemas.OrderRead]:
+) -> Response:
     """Get user's orders. Requires authentication."""
     orders = await crud.get_user_orders(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db, user_id=current_user.id, cursor=decode_cursor(cursor), limit=limit
     )
-    return [schemas.OrderRead.model_validate(o) for o in orders]
+    response = _json_response(_dump_list(_ORDER_LIST, orders))
+    set_next_cursor(response, orders, limit)
+    return response
 
 
 @router.get("/orders/{order_id}", response_model=schemas.OrderRead, tags=["Orders"])
@@ -305,7 +378,16 @@ async def pay_order(
     current_user: user_schemas.UserRead = Depends(get_current_user),
 ) -> schemas.OrderRead:
     """Simulate payment for order. Requires authentication."""
-    order = await crud.get_order_by_id(db, order_id)
+    # Simulate payment - generate fake payment_id
+    payment_id = f"PAY_{order_id}_{uuid4().hex[:8].upper()}"
+    order = await crud.pay_order(
+        db, order_id, user_id=current_user.id, payment_id=payment_id
+    )
+    if order is not None:
+        return schemas.OrderRead.model_validate(order)
+
+    # Nothing was updated: find out why
+    order = await crud.get_order_owner_and_status(db, order_id)
     if order is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -315,16 +397,10 @@ async def pay_order(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only pay for your own orders",
         )
-    if order.status != "pending":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Order is already {order.status}",
-        )
-
-    # Simulate payment - generate fake payment_id
-    payment_id = f"PAY_{order_id}_{uuid4().hex[:8].upper()}"
-    order = await crud.update_order_status(db, order_id, "paid", payment_id=payment_id)
-    return schemas.OrderRead.model_validate(order)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Order is already {order.status}",
+    )
 
 
 # Purchase endpoints (require authentication)
@@ -332,14 +408,40 @@ async def pay_order(
 async def get_purchases(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: user_schemas.UserRead = Depends(get_current_user),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER}"
+    ),
     limit: int = Query(100, ge=1, le=100),
-) -> list[schemas.PurchaseRead]:
+) -> Response:
     """Get user's purchase history. Requires authentication."""
     purchases = await crud.get_user_purchases(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db, user_id=current_user.id, cursor=decode_cursor(cursor), limit=limit
+    )
+    response = _json_response(_dump_list(_PURCHASE_LIST, purchases))
+    set_next_cursor(response, purchases, limit, timestamp_attr="purchased_at")
+    return response
+
+
+@router.get("/purchases/export", response_class=StreamingResponse, tags=["Purchases"])
+async def export_purchases(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: user_schemas.UserRead = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export the full purchase history as CSV. Requires authentication."""
+
+    async def rows():
+        yield "id,order_id,product_id,purchased_at\r\n"
+        async for purchase in crud.iter_user_purchases(db, user_id=current_user.id):
+            yield (
+                f"{purchase.id},{purchase.order_id},{purchase.product_id},"
+                f"{purchase.purchased_at.isoformat()}\r\n"
+            )
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="purchases.csv"'},
     )
-    return [schemas.PurchaseRead.model_validate(p) for p in purchases]
 
 
 @router.get(
@@ -351,10 +453,10 @@ async def get_purchase_content(
     order_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: user_schemas.UserRead = Depends(get_current_user),
-) -> list[schemas.PurchaseContentRead]:
+) -> StreamingResponse:
     """Get content text for purchased products. Requires authentication."""
     # Verify order belongs to user
-    order = await crud.get_order_by_id(db, order_id)
+    order = await crud.get_order_owner_and_status(db, order_id)
     if order is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
@@ -370,10 +472,11 @@ async def get_purchase_content(
             detail="Order must be paid to access content",
         )
 
-    content = await crud.get_purchase_content(
-        db, user_id=current_user.id, order_id=order_id
+    # Content texts can be large: stream the array instead of building it
+    content = crud.iter_purchase_content(db, user_id=current_user.id, order_id=order_id)
+    return StreamingResponse(
+        _json_array(content, _PURCHASE_CONTENT), media_type="application/json"
     )
-    return content
 
 
 @router.get(
@@ -404,13 +507,7 @@ async def create_review(
     current_user: user_schemas.UserRead = Depends(get_current_user),
 ) -> schemas.ReviewRead:
     """Create review for a product. Requires authentication and purchase."""
-    # Check if product exists
-    product = await crud.get_product_by_id(db, product_id)
-    if product is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
-        )
-
+    # Missing products are reported by crud.create_review
     review = await crud.create_review(
         db, review_in=review_in, user_id=current_user.id, product_id=product_id
     )
@@ -446,16 +543,17 @@ async def delete_review(
     current_user: user_schemas.UserRead = Depends(get_current_user),
 ) -> None:
     """Delete a review. Requires authentication and staff privileges for admin deletion."""
-    review = await crud.get_review_by_id(db, review_id)
-    if review is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Review not found"
-        )
+    # Staff may delete any review, others only their own
+    deleted = await crud.delete_review(
+        db,
+        review_id=review_id,
+        user_id=None if current_user.is_staff else current_user.id,
+    )
+    if deleted:
+        return
 
-    if review.user_id != current_user.id and not current_user.is_staff:
+    if await crud.get_review_by_id(db, review_id) is None:
         raise HTTPException(
-            status_code=403, detail="You can only delete your own reviews"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Review not found"
         )
-
-    # Delete review as staff
-    await crud.delete_review(db, review_id=review_id)
+    raise HTTPException(status_code=403, detail="You can only delete your own reviews")
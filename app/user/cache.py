@@ -0,0 +1,8 @@
+"""Per-process cache of authenticated users."""
+
+from app.cache import TTLCache
+from app.user.schemas import UserRead
+
+# Keyed by user id. Writes through app.user.crud invalidate entries; the TTL
+# bounds how long other workers may keep serving a changed or deleted user.
+users_cache: TTLCache[UserRead] = TTLCache(ttl=30.0, max_size=4096)
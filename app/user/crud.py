@@ -4,7 +4,10 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.db.utils import dialect_insert
+from app.user.cache import users_cache
 from app.user.models import User
 from app.user import schemas
 
@@ -39,12 +42,36 @@ async def create_user(
     except IntegrityError:
         await db.rollback()
         raise
-    await db.refresh(user)
     return user
 
 
+async def create_user_if_absent(
+    db: AsyncSession,
+    *,
+    email: str,
+    hashed_password: str,
+) -> Optional[User]:
+    """Insert a user in one statement; returns None if the email is taken."""
+    user = await db.scalar(
+        dialect_insert(db, User)
+        .values(email=email, hashed_password=hashed_password)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User)
+    )
+    await db.commit()
+    return user
+
+
+async def set_password_hash(db: AsyncSession, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    await db.commit()
+
+
 async def get_users(db: AsyncSession) -> Sequence[User]:
-    result = await db.execute(select(User))
+    # Listed as UserRead, which has no use for the password hash
+    result = await db.execute(
+        select(User).options(defer(User.hashed_password, raiseload=True))
+    )
     return result.scalars().all()
 
 
@@ -60,9 +87,8 @@ async def update_user(
         )
     user.email = user_in.email
     user.is_active = user_in.is_active
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
+    users_cache.delete(user_id)
     return user
 
 
@@ -81,14 +107,13 @@ async def patch_user(
     for field, value in user_fields.items():
         if value is not None:
             setattr(user, field, value)
-            db.add(user)
             user_changed = True
     if not user_changed:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No changes made"
         )
     await db.commit()
-    await db.refresh(user)
+    users_cache.delete(user_id)
     return user
 
 
@@ -103,3 +128,4 @@ async def delete_user(
         )
     await db.delete(user)
     await db.commit()
+    users_cache.delete(user_id)
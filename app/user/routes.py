@@ -1,51 +1,108 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.security import (
+    DUMMY_PASSWORD_HASH,
     create_access_token,
     decode_access_token,
     get_password_hash,
-    verify_password,
+    verify_password_and_check_rehash,
 )
+from app.config import get_settings
 from app.db.session import get_db
 from app.user import crud, schemas
+from app.user.cache import users_cache
+from app.user.models import User
+
+settings = get_settings()
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
+_USER_LIST = TypeAdapter(list[schemas.UserRead])
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> schemas.UserRead:
-    credentials_exception = HTTPException(
+
+# Errors are built per raise: a shared instance would accumulate tracebacks
+# and exception context across requests
+def _credentials_error() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _login_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _user_from_orm(user: User) -> schemas.UserRead:
+    # Rows loaded from the database are trusted; skip validation
+    return schemas.UserRead.model_construct(
+        id=user.id,
+        email=user.email,
+        is_active=user.is_active,
+        is_staff=user.is_staff,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+
+
+def _user_id_from_token(token: str) -> int:
     try:
-        payload = decode_access_token(token)
-        sub = payload.get("sub")
+        sub = decode_access_token(token).get("sub")
         if sub is None:
-            raise credentials_exception
-        user_id = int(sub)
+            raise _credentials_error()
+        return int(sub)
     except (JWTError, ValueError):
-        raise credentials_exception
+        raise _credentials_error()
+
 
+async def _load_current_user(db: AsyncSession, user_id: int) -> schemas.UserRead:
     user = await crud.get_user_by_id(db, user_id)
     if user is None:
-        raise credentials_exception
-    return schemas.UserRead.model_validate(user)
+        users_cache.delete(user_id)
+        raise _credentials_error()
+    current_user = _user_from_orm(user)
+    users_cache.set(user_id, current_user)
+    return current_user
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> schemas.UserRead:
+    """Resolve the token's user, served from users_cache when possible."""
+    user_id = _user_id_from_token(token)
+    current_user = users_cache.get(user_id)
+    if current_user is not None:
+        return current_user
+    return await _load_current_user(db, user_id)
+
+
+async def get_current_user_strict(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> schemas.UserRead:
+    """Resolve the token's user from the database, bypassing users_cache.
+
+    For endpoints that must act on the user's authoritative state.
+    """
+    return await _load_current_user(db, _user_id_from_token(token))
 
 
 def require_staff(
-    current_user: schemas.UserRead = Depends(get_current_user),
+    current_user: schemas.UserRead = Depends(get_current_user_strict),
 ) -> schemas.UserRead:
     """
     Dependency that requires the current user to be a staff member.
@@ -65,35 +122,38 @@ async def register_user(
     user_in: schemas.UserCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> schemas.UserRead:
-    existing = await crud.get_user_by_email(db, user_in.email)
-    if existing:
+    hashed_password = await get_password_hash(user_in.password)
+    user = await crud.create_user_if_absent(
+        db, email=user_in.email, hashed_password=hashed_password
+    )
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists",
         )
+    return _user_from_orm(user)
 
-    hashed_password = get_password_hash(user_in.password)
-    user = await crud.create_user(
-        db, email=user_in.email, hashed_password=hashed_password
-    )
-    return schemas.UserRead.model_validate(user)
 
-
-@router.post("/login")
+@router.post("/login", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[AsyncSession, Depends(get_db)],
-):
+) -> schemas.Token:
     user = await crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    hashed_password = user.hashed_password if user else DUMMY_PASSWORD_HASH
+    password_ok, needs_rehash = await verify_password_and_check_rehash(
+        form_data.password, hashed_password
+    )
+    if user is None or not password_ok:
+        raise _login_error()
 
     access_token = create_access_token(subject=user.id)
-    return {"access_token": access_token, "token_type": "bearer"}
+    if needs_rehash and settings.PASSWORD_REHASH_ON_LOGIN:
+        # The plain password is only available here, so upgrade the hash now
+        await crud.set_password_hash(
+            db, user, await get_password_hash(form_data.password)
+        )
+    return schemas.Token(access_token=access_token)
 
 
 async def get_current_user_or_none(
@@ -116,8 +176,16 @@ async def get_current_user_or_none(
 async def get_users(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: schemas.UserRead = Depends(get_current_user),
-) -> list[schemas.UserRead]:
-    return [schemas.UserRead.model_validate(user) for user in await crud.get_users(db)]
+) -> Response:
+    users = await crud.get_users(db)
+    # Validate and encode in one pydantic-core pass; returning a Response
+    # skips FastAPI's second validation of the content
+    return Response(
+        content=_USER_LIST.dump_json(
+            _USER_LIST.validate_python(users, from_attributes=True)
+        ),
+        media_type="application/json",
+    )
 
 
 @router.get("/me", response_model=schemas.UserRead)
@@ -133,9 +201,7 @@ async def update_current_user(
     current_user: Annotated[schemas.UserRead, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> schemas.UserRead:
-    return schemas.UserRead.model_validate(
-        await crud.update_user(db, current_user.id, user_in)
-    )
+    return _user_from_orm(await crud.update_user(db, current_user.id, user_in))
 
 
 @router.get(
@@ -153,7 +219,7 @@ async def get_user(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    return schemas.UserRead.model_validate(user)
+    return _user_from_orm(user)
 
 
 @router.put(
@@ -168,7 +234,7 @@ async def update_user(
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> schemas.UserRead:
     user = await crud.update_user(db, user_id, user_in)
-    return schemas.UserRead.model_validate(user)
+    return _user_from_orm(user)
 
 
 @router.patch(
@@ -183,7 +249,7 @@ async def patch_user(
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> schemas.UserRead:
     user = await crud.patch_user(db, user_id, user_in)
-    return schemas.UserRead.model_validate(user)
+    return _user_from_orm(user)
 
 
 @router.delete(
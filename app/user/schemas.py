@@ -15,7 +15,10 @@ class UserLogin(UserBase):
     password: str
 
 
-class UserRead(UserBase):
+class UserRead(BaseModel):
+    # Plain str: addresses were validated as EmailStr on the way in, and
+    # email-validator is far slower than the rest of the model
+    email: str = Field(json_schema_extra={"format": "email"})
     id: int
     is_active: bool
     is_staff: bool
@@ -38,3 +41,8 @@ class UserPatch(UserBase):
     email: str | None = None
     is_active: bool | None = None
     is_staff: bool | None = None
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
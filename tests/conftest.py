@@ -1,17 +1,27 @@
 import asyncio
 import os
-from typing import AsyncGenerator, Generator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, ContextManager, Generator, Iterator
 
 import pytest
 import pytest_asyncio
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.pool import StaticPool
 
-from app.auth.security import create_access_token, get_password_hash
+from app.auth.security import create_access_token, password_hasher
 from app.db.base import Base
 from app.db.session import get_db
 from app.main import app as fastapi_app
+from app.store.cache import categories_cache, product_lists_cache, products_cache
+from app.user.cache import users_cache
 from app.user.models import User
 from app.store.models import (
     Category,
@@ -23,7 +33,7 @@ from app.store.models import (
     Review,
 )
 from decimal import Decimal
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Use in-memory SQLite for testing
 TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -40,88 +50,170 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop.close()
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a new database session for each test case."""
-    # Set up the test database
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator[None, None, None]:
+    """Start every test with empty response and user caches."""
+    categories_cache.clear()
+    products_cache.clear()
+    product_lists_cache.clear()
+    users_cache.clear()
+    yield
+
+
+async def _create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture(scope="session")
+def db_engine() -> Generator[AsyncEngine, None, None]:
+    """Create the test database and its tables once for the whole run."""
+    # StaticPool keeps the single in-memory connection, and so the schema,
+    # alive between tests
     engine = create_async_engine(
         TEST_DB_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
 
-    # Create all tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work on SQLite
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
 
-    # Create a new session for testing
-    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
-        yield session
-        await session.rollback()
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    asyncio.run(_create_tables(engine))
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def count_queries(
+    db_engine: AsyncEngine,
+) -> Callable[[], ContextManager[list[str]]]:
+    """Return a context manager collecting the SQL statements run inside it.
+
+    Transaction control (BEGIN, SAVEPOINT, RELEASE, ROLLBACK) is left out so
+    counts only reflect the queries an endpoint issues.
+    """
+
+    @contextmanager
+    def _count_queries() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if not statement.startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")):
+                statements.append(statement)
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", _record)
+
+    return _count_queries
 
-    # Clean up
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
 
-    await engine.dispose()
+@pytest_asyncio.fixture(scope="function")
+async def db_connection(
+    db_engine: AsyncEngine,
+) -> AsyncGenerator[AsyncConnection, None]:
+    """Open a connection whose transaction is rolled back after each test."""
+    async with db_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+
+
+def _session_factory(conn: AsyncConnection) -> async_sessionmaker[AsyncSession]:
+    # Commits made by the test or the app only release savepoints
+    return async_sessionmaker(
+        bind=conn,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> TestClient:
-    """Create a test client that uses the override_get_db fixture."""
+async def db_session(
+    db_connection: AsyncConnection,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Create a new database session for each test case."""
+    async with _session_factory(db_connection)() as session:
+        yield session
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(db_connection: AsyncConnection) -> AsyncGenerator[AsyncClient, None]:
+    """Create a test client whose requests each get their own session."""
+    TestSessionLocal = _session_factory(db_connection)
 
     # Override the database dependency
     async def override_get_db():
-        try:
-            yield db_session
-        finally:
-            await db_session.close()
+        async with TestSessionLocal() as session:
+            yield session
 
     fastapi_app.dependency_overrides[get_db] = override_get_db
-    client = TestClient(fastapi_app)
-    return client
+    # Requests run in the test's event loop, with no thread or socket in between
+    async with AsyncClient(
+        transport=ASGITransport(app=fastapi_app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def password_hashes() -> dict[str, str]:
+    """Hash the fixture users' passwords once; argon2 is slow by design."""
+    return {
+        password: password_hasher.hash(password)
+        for password in ("testpassword", "staffpassword")
+    }
 
 
 @pytest_asyncio.fixture(scope="function")
-async def test_user(db_session: AsyncSession) -> User:
+async def test_user(db_session: AsyncSession, password_hashes: dict[str, str]) -> User:
     """Create a test user."""
     user_data = {
         "email": "test@example.com",
-        "hashed_password": get_password_hash("testpassword"),
+        "hashed_password": password_hashes["testpassword"],
         "is_active": True,
         "is_staff": False,
     }
     user = User(**user_data)
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
     return user
 
 
 @pytest_asyncio.fixture(scope="function")
-async def test_staff_user(db_session: AsyncSession) -> User:
+async def test_staff_user(
+    db_session: AsyncSession, password_hashes: dict[str, str]
+) -> User:
     """Create a test staff user."""
     user_data = {
         "email": "staff@example.com",
-        "hashed_password": get_password_hash("staffpassword"),
+        "hashed_password": password_hashes["staffpassword"],
         "is_active": True,
         "is_staff": True,
     }
     user = User(**user_data)
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
     return user
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest.fixture
 def user_token(test_user: User) -> str:
     """Generate a token for the test user."""
     return create_access_token(test_user.id, None, {"is_staff": test_user.is_staff})
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest.fixture
 def staff_token(test_staff_user: User) -> str:
     """Generate a token for the staff user."""
     return create_access_token(
@@ -129,15 +221,21 @@ def staff_token(test_staff_user: User) -> str:
     )
 
 
-@pytest_asyncio.fixture(scope="function")
-def authorized_client(client: TestClient, user_token: str) -> TestClient:
+@pytest.fixture
+def staff_headers(staff_token: str) -> dict[str, str]:
+    """Authorization headers for a single request made as the staff user."""
+    return {"Authorization": f"Bearer {staff_token}"}
+
+
+@pytest.fixture
+def authorized_client(client: AsyncClient, user_token: str) -> AsyncClient:
     """Create an authorized test client with a valid token."""
     client.headers.update({"Authorization": f"Bearer {user_token}"})
     return client
 
 
-@pytest_asyncio.fixture(scope="function")
-def staff_authorized_client(client: TestClient, staff_token: str) -> TestClient:
+@pytest.fixture
+def staff_authorized_client(client: AsyncClient, staff_token: str) -> AsyncClient:
     """Create an authorized test client with a staff token."""
     client.headers.update({"Authorization": f"Bearer {staff_token}"})
     return client
@@ -152,7 +250,6 @@ async def test_category(db_session: AsyncSession) -> Category:
     category = Category(name="Test Category", description="Test category description")
     db_session.add(category)
     await db_session.commit()
-    await db_session.refresh(category)
     return category
 
 
@@ -168,7 +265,6 @@ async def test_product(db_session: AsyncSession, test_category: Category) -> Pro
     )
     db_session.add(product)
     await db_session.commit()
-    await db_session.refresh(product)
     return product
 
 
@@ -180,7 +276,6 @@ async def test_cart_item(
     cart_item = CartItem(user=test_user, product=test_product, quantity=1)
     db_session.add(cart_item)
     await db_session.commit()
-    await db_session.refresh(cart_item)
     return cart_item
 
 
@@ -190,7 +285,6 @@ async def test_order(db_session: AsyncSession, test_user: User) -> Order:
     order = Order(user=test_user, total_amount=Decimal("199.98"), status="completed")
     db_session.add(order)
     await db_session.commit()
-    await db_session.refresh(order)
     return order
 
 
@@ -207,7 +301,6 @@ async def test_order_item(
     )
     db_session.add(order_item)
     await db_session.commit()
-    await db_session.refresh(order_item)
     return order_item
 
 
@@ -220,11 +313,10 @@ async def test_purchase(
         user=test_user,
         order=test_order,
         product=test_product,
-        purchased_at=datetime.utcnow() - timedelta(days=1),
+        purchased_at=datetime.now(timezone.utc) - timedelta(days=1),
     )
     db_session.add(purchase)
     await db_session.commit()
-    await db_session.refresh(purchase)
     return purchase
 
 
@@ -241,5 +333,4 @@ async def test_review(
     )
     db_session.add(review)
     await db_session.commit()
-    await db_session.refresh(review)
     return review
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import JWTError, jwt
+
+from app.auth import security
+from app.auth.security import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    settings,
+    verify_password,
+    verify_password_and_check_rehash,
+)
+
+
+def test_create_access_token_is_valid_jwt():
+    """Test that minted tokens verify with a standard JWT library."""
+    token = create_access_token(7, additional_claims={"is_staff": True})
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["sub"] == "7"
+    assert payload["is_staff"] is True
+    assert isinstance(payload["exp"], int)
+
+
+def test_create_access_token_datetime_claims():
+    """Test that datetime time claims are encoded as NumericDate like jose."""
+    issued_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    claims = {"iat": issued_at, "nbf": issued_at}
+
+    token = create_access_token(7, additional_claims=claims)
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["iat"] == payload["nbf"] == int(issued_at.timestamp())
+    assert (
+        token.split(".")[1]
+        == jwt.encode(
+            {"sub": "7", **claims, "exp": payload["exp"]},
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM,
+        ).split(".")[1]
+    )
+
+
+def test_decode_access_token_is_cached():
+    """Test that a decoded token is served from the cache on repeat calls."""
+    token = create_access_token(42)
+
+    payload = decode_access_token(token)
+    assert payload["sub"] == "42"
+    assert token in security._TOKEN_CACHE
+    assert decode_access_token(token) is payload
+
+
+def test_decode_expired_token_not_cached():
+    """Test that an expired token is rejected and never cached."""
+    token = create_access_token(42, expires_delta=timedelta(seconds=-1))
+
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+    assert token not in security._TOKEN_CACHE
+
+
+@pytest.mark.asyncio
+async def test_verify_password():
+    """Test verifying argon2id and legacy pbkdf2_sha256 password hashes."""
+    hashed = await get_password_hash("secret-password")
+    assert hashed.startswith("$argon2id$")
+    assert await verify_password("secret-password", hashed)
+    assert not await verify_password("wrong-password", hashed)
+
+    legacy_hashed = security.legacy_pwd_context.hash("secret-password")
+    assert await verify_password("secret-password", legacy_hashed)
+    assert not await verify_password("wrong-password", legacy_hashed)
+
+
+@pytest.mark.asyncio
+async def test_verify_password_needs_rehash():
+    """Test that only verified legacy or outdated hashes need rehashing."""
+    hashed = await get_password_hash("secret-password")
+    assert await verify_password_and_check_rehash("secret-password", hashed) == (
+        True,
+        False,
+    )
+
+    legacy_hashed = security.legacy_pwd_context.hash("secret-password")
+    assert await verify_password_and_check_rehash("secret-password", legacy_hashed) == (
+        True,
+        True,
+    )
+    assert await verify_password_and_check_rehash("wrong-password", legacy_hashed) == (
+        False,
+        False,
+    )
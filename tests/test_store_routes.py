@@ -1,35 +1,42 @@
 import pytest
 from fastapi import status
+from sqlalchemy import insert
 
 
 # Test categories
 
 
-def test_get_categories(client):
+@pytest.mark.asyncio
+async def test_get_categories(client):
     """Test getting all categories (public endpoint)."""
-    response = client.get("/api/store/categories")
+    response = await client.get("/api/store/categories")
     assert response.status_code == status.HTTP_200_OK
     assert isinstance(response.json(), list)
 
 
-def test_create_category_unauthorized(client):
+@pytest.mark.asyncio
+async def test_create_category_unauthorized(client):
     """Test creating a category without authentication."""
     category_data = {"name": "Test Category", "description": "Test Description"}
-    response = client.post("/api/store/categories", json=category_data)
+    response = await client.post("/api/store/categories", json=category_data)
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
-def test_create_category_not_staff(authorized_client):
+@pytest.mark.asyncio
+async def test_create_category_not_staff(authorized_client):
     """Test creating a category as non-staff user."""
     category_data = {"name": "Test Category", "description": "Test Description"}
-    response = authorized_client.post("/api/store/categories", json=category_data)
+    response = await authorized_client.post("/api/store/categories", json=category_data)
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-def test_create_category_staff(staff_authorized_client):
+@pytest.mark.asyncio
+async def test_create_category_staff(staff_authorized_client):
     """Test creating a category as staff user."""
     category_data = {"name": "Test Category", "description": "Test Description"}
-    response = staff_authorized_client.post("/api/store/categories", json=category_data)
+    response = await staff_authorized_client.post(
+        "/api/store/categories", json=category_data
+    )
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert data["name"] == category_data["name"]
@@ -37,10 +44,27 @@ def test_create_category_staff(staff_authorized_client):
     assert "id" in data
 
 
+@pytest.mark.asyncio
+async def test_get_categories_cache_invalidated_on_create(staff_authorized_client):
+    """Test the cached category list is refreshed after creating a category."""
+    response = await staff_authorized_client.get("/api/store/categories")
+    assert response.json() == []
+
+    category_data = {"name": "Test Category", "description": "Test Description"}
+    response = await staff_authorized_client.post(
+        "/api/store/categories", json=category_data
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await staff_authorized_client.get("/api/store/categories")
+    assert [c["name"] for c in response.json()] == ["Test Category"]
+
+
 # Test products
 
 
-def test_get_products(client, db_session, test_category):
+@pytest.mark.asyncio
+async def test_get_products(client, db_session, test_category):
     """Test getting all products (public endpoint)."""
     # Create a test product
     product_data = {
@@ -56,19 +80,67 @@ def test_get_products(client, db_session, test_category):
 
     product = Product(**product_data)
     db_session.add(product)
-    db_session.commit()
-    db_session.refresh(product)
+    await db_session.commit()
 
     # Test getting all products
-    response = client.get("/api/store/products")
+    response = await client.get("/api/store/products")
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
-    assert any(p["title"] == "Test Product" for p in data)
+    assert [p["title"] for p in data] == ["Test Product"]
 
 
-def test_create_product_staff(staff_authorized_client, test_category, test_user):
+@pytest.mark.asyncio
+async def test_get_products_cursor_pagination(client, db_session):
+    """Test paging through products with the keyset cursor."""
+    from datetime import datetime, timedelta
+
+    from app.store.models import Product
+
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    db_session.add_all(
+        [
+            Product(
+                title=f"Product {i}",
+                description=f"Product {i} description",
+                content_text=f"Product {i} content",
+                price=10 + i,
+                created_at=created_at + timedelta(minutes=i),
+            )
+            for i in range(3)
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get("/api/store/products?limit=2")
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["title"] for p in response.json()] == ["Product 2", "Product 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get(f"/api/store/products?limit=2&cursor={cursor}")
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["title"] for p in response.json()] == ["Product 0"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_products_with_category(client, test_product, test_category):
+    """Test products are listed with their category on every request."""
+    for _ in range(2):
+        response = await client.get("/api/store/products")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data[0]["category"]["id"] == test_category.id
+
+
+@pytest.mark.asyncio
+async def test_get_products_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get("/api/store/products?cursor=not-a-cursor")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_create_product_staff(staff_authorized_client, test_category, test_user):
     """Test creating a product as staff user."""
     product_data = {
         "title": "New Product",
@@ -78,7 +150,9 @@ def test_create_product_staff(staff_authorized_client, test_category, test_user)
         "category_id": test_category.id,
     }
 
-    response = staff_authorized_client.post("/api/store/products", json=product_data)
+    response = await staff_authorized_client.post(
+        "/api/store/products", json=product_data
+    )
 
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
@@ -87,7 +161,31 @@ def test_create_product_staff(staff_authorized_client, test_category, test_user)
     assert data["category_id"] == test_category.id
 
 
-def test_create_products_staff(staff_authorized_client, test_category):
+@pytest.mark.asyncio
+async def test_get_products_cache_invalidated_on_create(
+    staff_authorized_client, test_category
+):
+    """Test the cached product list is refreshed after creating a product."""
+    response = await staff_authorized_client.get("/api/store/products")
+    assert response.json() == []
+
+    product_data = {
+        "title": "Test Product",
+        "content_text": "Test content",
+        "price": 10.00,
+        "category_id": test_category.id,
+    }
+    response = await staff_authorized_client.post(
+        "/api/store/products", json=product_data
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await staff_authorized_client.get("/api/store/products")
+    assert [p["title"] for p in response.json()] == ["Test Product"]
+
+
+@pytest.mark.asyncio
+async def test_create_products_staff(staff_authorized_client, test_category):
     """Test creating multiple products as staff user."""
     products_data = {
         "products": [
@@ -108,7 +206,7 @@ def test_create_products_staff(staff_authorized_client, test_category):
         ]
     }
 
-    response = staff_authorized_client.post(
+    response = await staff_authorized_client.post(
         "/api/store/products/create-many", json=products_data
     )
 
@@ -125,12 +223,13 @@ def test_create_products_staff(staff_authorized_client, test_category):
 # Test cart functionality
 
 
-def test_add_to_cart_anonymous(client, db_session, test_product):
+@pytest.mark.asyncio
+async def test_add_to_cart_anonymous(client, db_session, test_product):
     """Test adding an item to cart as anonymous user (using session_id)."""
     session_id = "test-session-123"
     cart_item = {"product_id": test_product.id, "quantity": 2, "session_id": session_id}
 
-    response = client.post("/api/store/cart", json=cart_item)
+    response = await client.post("/api/store/cart", json=cart_item)
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert data["product_id"] == test_product.id
@@ -138,25 +237,83 @@ def test_add_to_cart_anonymous(client, db_session, test_product):
     assert data["session_id"] == session_id
 
 
-def test_add_to_cart_authenticated(authorized_client, test_product):
+@pytest.mark.asyncio
+async def test_add_to_cart_authenticated(authorized_client, test_product):
     """Test adding an item to cart as authenticated user."""
     cart_item = {"product_id": test_product.id, "quantity": 1}
 
-    response = authorized_client.post("/api/store/cart", json=cart_item)
+    response = await authorized_client.post("/api/store/cart", json=cart_item)
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert data["product_id"] == test_product.id
     assert data["quantity"] == 1
 
 
+@pytest.mark.asyncio
+async def test_add_to_cart_twice(authorized_client, test_product):
+    """Test adding the same product twice increments the quantity."""
+    cart_item = {"product_id": test_product.id, "quantity": 1}
+
+    first = await authorized_client.post("/api/store/cart", json=cart_item)
+    assert first.status_code == status.HTTP_201_CREATED
+    second = await authorized_client.post("/api/store/cart", json=cart_item)
+    assert second.status_code == status.HTTP_201_CREATED
+    data = second.json()
+    assert data["id"] == first.json()["id"]
+    assert data["quantity"] == 2
+
+    response = await authorized_client.get("/api/store/cart")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_add_to_cart_product_not_found(authorized_client):
+    """Test adding a nonexistent product to the cart."""
+    response = await authorized_client.post("/api/store/cart", json={"product_id": 999})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_add_to_cart_inactive_product(
+    authorized_client, test_product, db_session
+):
+    """Test adding an inactive product to the cart."""
+    from sqlalchemy import update
+
+    from app.store.models import Product
+
+    await db_session.execute(
+        update(Product).where(Product.id == test_product.id).values(is_active=False)
+    )
+    await db_session.commit()
+
+    response = await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_clear_cart(authorized_client, test_cart_item):
+    """Test clearing the cart as authenticated user."""
+    response = await authorized_client.delete("/api/store/cart")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await authorized_client.get("/api/store/cart")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
 # Test orders
 
 
-def test_create_order(authorized_client, test_product):
+@pytest.mark.asyncio
+async def test_create_order(authorized_client, test_product):
     """Test creating an order from cart."""
     # First add item to cart
     cart_item = {"product_id": test_product.id, "quantity": 1}
-    authorized_client.post("/api/store/cart", json=cart_item)
+    await authorized_client.post("/api/store/cart", json=cart_item)
 
     # Create order
     order_data = {
@@ -164,7 +321,7 @@ def test_create_order(authorized_client, test_product):
         "payment_method": "credit_card",
     }
 
-    response = authorized_client.post("/api/store/orders", json=order_data)
+    response = await authorized_client.post("/api/store/orders", json=order_data)
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert data["status"] == "pending"
@@ -173,14 +330,151 @@ def test_create_order(authorized_client, test_product):
     assert data["order_items"][0]["product_id"] == test_product.id
 
 
+@pytest.mark.asyncio
+async def test_create_order_with_quantity(authorized_client, test_product):
+    """Test the order total and item price account for quantity."""
+    cart_item = {"product_id": test_product.id, "quantity": 3}
+    await authorized_client.post("/api/store/cart", json=cart_item)
+
+    response = await authorized_client.post("/api/store/orders", json={})
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["total_amount"] == str(test_product.price * 3)
+    assert data["order_items"][0]["quantity"] == 3
+    assert data["order_items"][0]["price_at_purchase"] == str(test_product.price)
+    assert data["order_items"][0]["product"]["id"] == test_product.id
+
+
+@pytest.mark.asyncio
+async def test_create_order_inactive_products(
+    authorized_client, test_product, test_category, db_session
+):
+    """Test that a cart with inactive products is rejected without an order."""
+    from sqlalchemy import func, select, update
+
+    from app.store.models import Order, Product
+
+    inactive_product = Product(
+        title="Inactive Product",
+        description="Inactive product description",
+        content_text="Inactive product content",
+        price=test_product.price,
+        category_id=test_category.id,
+    )
+    db_session.add(inactive_product)
+    await db_session.commit()
+
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": inactive_product.id}
+    )
+    await db_session.execute(
+        update(Product).where(Product.id == inactive_product.id).values(is_active=False)
+    )
+    await db_session.commit()
+
+    response = await authorized_client.post("/api/store/orders", json={})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == (
+        f"Products are not active: {inactive_product.id}"
+    )
+    assert await db_session.scalar(select(func.count()).select_from(Order)) == 0
+
+    response = await authorized_client.get("/api/store/cart")
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(item["product_id"] for item in response.json()) == [
+        test_product.id,
+        inactive_product.id,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_orders(authorized_client, test_product):
+    """Test listing the user's orders with their items."""
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    await authorized_client.post("/api/store/orders", json={})
+
+    response = await authorized_client.get("/api/store/orders")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["order_items"][0]["product"]["title"] == test_product.title
+
+
+@pytest.mark.asyncio
+async def test_get_order(authorized_client, test_product):
+    """Test getting a single order with its items."""
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    order = (await authorized_client.post("/api/store/orders", json={})).json()
+
+    response = await authorized_client.get(f"/api/store/orders/{order['id']}")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["id"] == order["id"]
+    assert data["order_items"][0]["product"]["title"] == test_product.title
+
+
+@pytest.mark.asyncio
+async def test_pay_order(authorized_client, test_product):
+    """Test paying for a pending order."""
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    order = (await authorized_client.post("/api/store/orders", json={})).json()
+
+    response = await authorized_client.post(f"/api/store/orders/{order['id']}/pay")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "paid"
+    assert data["payment_id"].startswith(f"PAY_{order['id']}_")
+    assert len(data["order_items"]) == 1
+
+    response = await authorized_client.post(f"/api/store/orders/{order['id']}/pay")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_pay_order_not_found(authorized_client):
+    """Test paying for a nonexistent order."""
+    response = await authorized_client.post("/api/store/orders/999/pay")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_pay_order_grants_purchases(authorized_client, test_product):
+    """Test paying for an order records purchases and unlocks content."""
+    await authorized_client.post(
+        "/api/store/cart", json={"product_id": test_product.id}
+    )
+    order = (await authorized_client.post("/api/store/orders", json={})).json()
+    await authorized_client.post(f"/api/store/orders/{order['id']}/pay")
+
+    response = await authorized_client.get("/api/store/purchases")
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["product_id"] for p in response.json()] == [test_product.id]
+
+    response = await authorized_client.get(
+        f"/api/store/purchases/{order['id']}/content"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["content_text"] == "Detailed test product description"
+
+
 # Test reviews
 
 
-def test_create_review(authorized_client, test_product, test_purchase):
+@pytest.mark.asyncio
+async def test_create_review(authorized_client, test_product, test_purchase):
     """Test creating a product review."""
     review_data = {"rating": 5, "comment": "Great product!"}
 
-    response = authorized_client.post(
+    response = await authorized_client.post(
         f"/api/store/products/{test_product.id}/reviews", json=review_data
     )
 
@@ -191,31 +485,85 @@ def test_create_review(authorized_client, test_product, test_purchase):
     assert data["product_id"] == test_product.id
 
 
-def test_get_reviews_staff_unauthorized(client, test_review):
+@pytest.mark.asyncio
+async def test_create_review_not_purchased(authorized_client, test_product):
+    """Test that a user cannot review a product they have not purchased."""
+    review_data = {"rating": 5, "comment": "Great product!"}
+
+    response = await authorized_client.post(
+        f"/api/store/products/{test_product.id}/reviews", json=review_data
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_create_review_product_not_found(authorized_client):
+    """Test reviewing a nonexistent product."""
+    response = await authorized_client.post(
+        "/api/store/products/999/reviews", json={"rating": 5}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_create_review_twice(authorized_client, test_product, test_review):
+    """Test that a user cannot review the same product twice."""
+    review_data = {"rating": 4, "comment": "Still great"}
+
+    response = await authorized_client.post(
+        f"/api/store/products/{test_product.id}/reviews", json=review_data
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_get_product_reviews_with_user(
+    client, test_review, test_user, count_queries
+):
+    """Test product reviews are listed with their author on every request."""
+    for _ in range(2):
+        with count_queries() as queries:
+            response = await client.get(
+                f"/api/store/products/{test_review.product_id}/reviews"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        # Product check, reviews, then all their authors in one query
+        assert len(queries) == 3
+        data = response.json()
+        assert data[0]["user"]["id"] == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_get_reviews_staff_unauthorized(client, test_review):
     """Test getting all reviews without authentication - should be unauthorized."""
-    response = client.get("/api/store/reviews")
+    response = await client.get("/api/store/reviews")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
-def test_get_reviews_staff_unauthorized_like_staff(authorized_client, test_review):
+@pytest.mark.asyncio
+async def test_get_reviews_staff_unauthorized_like_staff(
+    authorized_client, test_review
+):
     """Test getting all reviews as non-staff user - should be forbidden."""
-    response = authorized_client.get("/api/store/reviews")
+    response = await authorized_client.get("/api/store/reviews")
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-def test_get_reviews_staff(staff_authorized_client, test_review):
+@pytest.mark.asyncio
+async def test_get_reviews_staff(staff_authorized_client, test_review):
     """Test staff user getting all reviews."""
-    response = staff_authorized_client.get("/api/store/reviews")
+    response = await staff_authorized_client.get("/api/store/reviews")
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
-    assert any(r["id"] == test_review.id for r in data)
+    assert [r["id"] for r in data] == [test_review.id]
 
 
-def test_get_reviews_by_product(staff_authorized_client, test_review):
+@pytest.mark.asyncio
+async def test_get_reviews_by_product(staff_authorized_client, test_review):
     """Test getting reviews filtered by product."""
-    response = staff_authorized_client.get(
+    response = await staff_authorized_client.get(
         f"/api/store/reviews?product_id={test_review.product_id}"
     )
     assert response.status_code == status.HTTP_200_OK
@@ -225,12 +573,33 @@ def test_get_reviews_by_product(staff_authorized_client, test_review):
     assert data[0]["product_id"] == test_review.product_id
 
 
-def test_delete_review_own(authorized_client, test_review):
+@pytest.mark.asyncio
+async def test_update_review(authorized_client, test_review, test_user):
+    """Test updating own review."""
+    response = await authorized_client.put(
+        f"/api/store/reviews/{test_review.id}", json={"rating": 4}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["rating"] == 4
+    assert data["comment"] == test_review.comment
+    assert data["user"]["email"] == test_user.email
+
+
+@pytest.mark.asyncio
+async def test_delete_review_own(authorized_client, test_review):
     """Test deleting own review as regular user."""
-    response = authorized_client.delete(f"/api/store/reviews/{test_review.id}")
+    response = await authorized_client.delete(f"/api/store/reviews/{test_review.id}")
     assert response.status_code == status.HTTP_204_NO_CONTENT
 
 
+@pytest.mark.asyncio
+async def test_delete_review_not_found(authorized_client):
+    """Test deleting a review that does not exist."""
+    response = await authorized_client.delete("/api/store/reviews/999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.asyncio
 async def test_delete_review_other_unauthorized(
     authorized_client, test_review, test_staff_user, db_session
@@ -239,33 +608,71 @@ async def test_delete_review_other_unauthorized(
     # Create review by staff user
     from app.store.models import Review
 
-    new_review = Review(
-        user_id=test_staff_user.id,
-        product_id=test_review.product_id,
-        rating=4,
-        comment="Staff review",
+    result = await db_session.execute(
+        insert(Review)
+        .values(
+            user_id=test_staff_user.id,
+            product_id=test_review.product_id,
+            rating=4,
+            comment="Staff review",
+        )
+        .returning(Review.id)
     )
-    db_session.add(new_review)
+    new_review_id = result.scalar_one()
     await db_session.commit()
 
-    response = authorized_client.delete(f"/api/store/reviews/{new_review.id}")
+    response = await authorized_client.delete(f"/api/store/reviews/{new_review_id}")
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-def test_delete_review_staff(staff_authorized_client, test_review):
+@pytest.mark.asyncio
+async def test_delete_review_staff(staff_authorized_client, test_review):
     """Test staff user deleting any review."""
-    response = staff_authorized_client.delete(f"/api/store/reviews/{test_review.id}")
+    response = await staff_authorized_client.delete(
+        f"/api/store/reviews/{test_review.id}"
+    )
     assert response.status_code == status.HTTP_204_NO_CONTENT
 
 
 # Test purchases
 
 
-def test_get_purchases(authorized_client, test_purchase):
+@pytest.mark.asyncio
+async def test_get_purchases(authorized_client, test_purchase):
     """Test getting user's purchase history."""
-    response = authorized_client.get("/api/store/purchases")
+    response = await authorized_client.get("/api/store/purchases")
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
-    assert any(p["id"] == test_purchase.id for p in data)
+    assert [p["id"] for p in data] == [test_purchase.id]
+
+
+@pytest.mark.asyncio
+async def test_get_purchase_content(
+    authorized_client, test_order, test_purchase, test_product, db_session
+):
+    """Test getting content of purchased products from a paid order."""
+    test_order.status = "paid"
+    await db_session.commit()
+
+    response = await authorized_client.get(
+        f"/api/store/purchases/{test_order.id}/content"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["product_id"] == test_product.id
+    assert data[0]["product_title"] == test_product.title
+    assert data[0]["content_text"] == "Detailed test product description"
+
+
+@pytest.mark.asyncio
+async def test_export_purchases(authorized_client, test_purchase):
+    """Test exporting the purchase history as CSV."""
+    response = await authorized_client.get("/api/store/purchases/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    header, row = response.text.splitlines()
+    assert header == "id,order_id,product_id,purchased_at"
+    assert row.startswith(
+        f"{test_purchase.id},{test_purchase.order_id},{test_purchase.product_id},"
+    )
@@ -1,15 +1,21 @@
+import pytest
 from fastapi import status
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy import select
 
+from app.auth.security import legacy_pwd_context
+from app.user.models import User
 
-def test_register_user(client: TestClient):
+
+@pytest.mark.asyncio
+async def test_register_user(client: AsyncClient):
     """Test user registration."""
     user_data = {
         "email": "newuser@example.com",
         "password": "testpassword123",
     }
 
-    response = client.post("/api/users/register", json=user_data)
+    response = await client.post("/api/users/register", json=user_data)
     assert response.status_code == status.HTTP_201_CREATED
 
     data = response.json()
@@ -18,11 +24,21 @@ def test_register_user(client: TestClient):
     assert "hashed_password" not in data
 
 
-def test_login_user(client: TestClient, test_user):
+@pytest.mark.asyncio
+async def test_register_user_existing_email(client: AsyncClient, test_user):
+    """Test registering an email that is already taken."""
+    user_data = {"email": test_user.email, "password": "testpassword123"}
+
+    response = await client.post("/api/users/register", json=user_data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_login_user(client: AsyncClient, test_user):
     """Test user login."""
     login_data = {"username": "test@example.com", "password": "testpassword"}
 
-    response = client.post("/api/users/login", data=login_data)
+    response = await client.post("/api/users/login", data=login_data)
     assert response.status_code == status.HTTP_200_OK
 
     data = response.json()
@@ -30,9 +46,69 @@ def test_login_user(client: TestClient, test_user):
     assert data["token_type"] == "bearer"
 
 
-def test_read_users_me(authorized_client: TestClient, test_user):
+@pytest.mark.asyncio
+async def test_login_user_upgrades_legacy_hash(client: AsyncClient, db_session):
+    """Test that logging in replaces a pbkdf2_sha256 hash with argon2id."""
+    user = User(
+        email="legacy@example.com",
+        hashed_password=legacy_pwd_context.hash("legacypassword"),
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    login_data = {"username": "legacy@example.com", "password": "legacypassword"}
+    response = await client.post("/api/users/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+
+    hashed_password = await db_session.scalar(
+        select(User.hashed_password).where(User.id == user.id)
+    )
+    assert hashed_password.startswith("$argon2")
+
+    response = await client.post("/api/users/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "username, password",
+    [
+        ("test@example.com", "wrongpassword"),
+        ("unknown@example.com", "testpassword"),
+    ],
+)
+async def test_login_user_invalid(client: AsyncClient, test_user, username, password):
+    """Test login fails the same way for a wrong password and unknown user."""
+    login_data = {"username": username, "password": password}
+
+    response = await client.post("/api/users/login", data=login_data)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Incorrect email or password"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("GET", "/api/users/me"),
+        ("PATCH", "/api/users/me"),
+        ("GET", "/api/users/"),
+        ("GET", "/api/users/1"),
+        ("PUT", "/api/users/1"),
+        ("PATCH", "/api/users/1"),
+        ("DELETE", "/api/users/1"),
+    ],
+)
+async def test_user_routes_require_auth(client: AsyncClient, method, path):
+    """Test protected user endpoints reject requests without a token."""
+    response = await client.request(method, path, json={})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_read_users_me(authorized_client: AsyncClient, test_user):
     """Test getting current user info."""
-    response = authorized_client.get("/api/users/me")
+    response = await authorized_client.get("/api/users/me")
     assert response.status_code == status.HTTP_200_OK
 
     data = response.json()
@@ -40,75 +116,95 @@ def test_read_users_me(authorized_client: TestClient, test_user):
     assert data["is_active"] is True
 
 
-def test_update_user_me(authorized_client: TestClient, test_user):
+@pytest.mark.asyncio
+async def test_update_user_me(authorized_client: AsyncClient, test_user):
     """Test updating current user."""
     update_data = {"email": "updated@example.com"}
 
-    response = authorized_client.patch("/api/users/me", json=update_data)
+    response = await authorized_client.patch("/api/users/me", json=update_data)
     assert response.status_code == status.HTTP_200_OK
 
     data = response.json()
     assert data["email"] == update_data["email"]
 
 
-def test_read_users(
-    authorized_client: TestClient, test_user, test_staff_user, staff_token
+@pytest.mark.asyncio
+async def test_read_users_me_after_update(authorized_client: AsyncClient, test_user):
+    """Test the current user is not served stale after an update."""
+    response = await authorized_client.get("/api/users/me")
+    assert response.status_code == status.HTTP_200_OK
+
+    update_data = {"email": "updated@example.com"}
+    response = await authorized_client.patch("/api/users/me", json=update_data)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await authorized_client.get("/api/users/me")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == update_data["email"]
+
+
+@pytest.mark.asyncio
+async def test_read_users(
+    authorized_client: AsyncClient, test_user, staff_headers, count_queries
 ):
     """Test getting all users (staff only)."""
     # Regular user should be forbidden
-    response = authorized_client.get("/api/users/")
+    response = await authorized_client.get("/api/users/")
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
     # Staff user should be allowed
-    staff_client = TestClient(authorized_client.app)
-    staff_client.headers.update({"Authorization": f"Bearer {staff_token}"})
-
-    response = staff_client.get("/api/users/")
+    with count_queries() as queries:
+        response = await authorized_client.get("/api/users/", headers=staff_headers)
     assert response.status_code == status.HTTP_200_OK
+    # Staff check and the list itself
+    assert len(queries) == 2
 
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 2  # At least test_user and test_staff_user
+    assert sorted(u["email"] for u in data) == [
+        "staff@example.com",
+        "test@example.com",
+    ]
 
 
-def test_read_user(
-    authorized_client: TestClient, test_user, test_staff_user, staff_token
+@pytest.mark.asyncio
+async def test_read_user(
+    authorized_client: AsyncClient, test_user, staff_headers, count_queries
 ):
     """Test getting a specific user by ID (staff only)."""
     user_id = test_user.id
 
     # Regular user should be forbidden
-    response = authorized_client.get(f"/api/users/{user_id}")
+    response = await authorized_client.get(f"/api/users/{user_id}")
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
     # Staff user should be allowed
-    staff_client = TestClient(authorized_client.app)
-    staff_client.headers.update({"Authorization": f"Bearer {staff_token}"})
-
-    response = staff_client.get(f"/api/users/{user_id}")
+    with count_queries() as queries:
+        response = await authorized_client.get(
+            f"/api/users/{user_id}", headers=staff_headers
+        )
     assert response.status_code == status.HTTP_200_OK
+    # Staff check and the user lookup
+    assert len(queries) == 2
 
     data = response.json()
     assert data["id"] == user_id
     assert data["email"] == "test@example.com"
 
 
-def test_update_user(
-    authorized_client: TestClient, test_user, test_staff_user, staff_token
-):
+@pytest.mark.asyncio
+async def test_update_user(authorized_client: AsyncClient, test_user, staff_headers):
     """Test updating a user (staff only)."""
     user_id = test_user.id
     update_data = {"is_active": False, "is_staff": True}
 
     # Regular user should be forbidden
-    response = authorized_client.patch(f"/api/users/{user_id}", json=update_data)
+    response = await authorized_client.patch(f"/api/users/{user_id}", json=update_data)
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
     # Staff user should be allowed
-    staff_client = TestClient(authorized_client.app)
-    staff_client.headers.update({"Authorization": f"Bearer {staff_token}"})
-
-    response = staff_client.patch(f"/api/users/{user_id}", json=update_data)
+    response = await authorized_client.patch(
+        f"/api/users/{user_id}", json=update_data, headers=staff_headers
+    )
     assert response.status_code == status.HTTP_200_OK
 
     data = response.json()